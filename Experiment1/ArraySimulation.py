@@ -0,0 +1,377 @@
+#-----Imports-----#
+import numpy as np
+
+from CommNetwork import CommNetworkStore
+from SmellField import smellFood
+from Spawner import FreeCellSampler
+from OccupancyGrid import OccupancyGrid, directions
+from GridRenderer import GridRenderer
+from Palette import tileColors, creatureColors
+
+
+# Steps in the order of the columns of smellFood: up, down, right and left
+smellDirections = [[0, 1], [0, -1], [1, 0], [-1, 0]]
+
+
+# Alternative to the object engine in Simulation1.py
+# Creatures are stored as a struct of arrays where slots 0..n-1 hold the living creatures in order of creation
+# Feeding, energy drain, death and replication act on the whole population at once
+class ArraySimulation:
+
+    def __init__(self, Lx, Ly, seed=None):
+
+        self.Lx, self.Ly = Lx, Ly
+
+        # All randomness of the run comes from this generator, seed can be an int or a SeedSequence
+        self.rng = np.random.default_rng(seed)
+
+        self.foodArray = np.zeros((Lx,Ly), dtype=float)
+        self.bloodArray = np.zeros((Lx, Ly), dtype=float)
+
+        # There is at most one creature per tile, so Lx * Ly slots is always enough
+        capacity = Lx * Ly
+        self.n = 0
+        self.xArray = np.zeros(capacity, dtype=int)
+        self.yArray = np.zeros(capacity, dtype=int)
+        self.energyArray = np.zeros(capacity, dtype=float)
+        self.canMutateArray = np.zeros(capacity, dtype=bool)
+        self.toBeDestroyedArray = np.zeros(capacity, dtype=bool)
+        self.idArray = np.zeros(capacity, dtype=int)
+        self.walkedArray = np.zeros(capacity, dtype=bool)
+
+        self.battledIds = {}  # Creature id -> ids of the living creatures it has battled, as Creature.battledCreatures
+
+        # Slot of the creature at each tile, -1 if empty
+        self.occupancy = OccupancyGrid(Lx, Ly)
+
+        self.muteCreatureCountLog = []
+        self.commCreatureCountLog = []
+
+        self.foodSpawnChance = 0.001  # Food spawn chance per tile per tick
+        self.foodInitEnergy = 50
+
+        self.creatureSpawnChance = 0.05  # Creature spawn chance per tile per tick
+        self.creatureInitEnergy = 100
+        self.creatureOffspringEnergy = 200
+
+        self.creatureEatEnergy = 5
+        self.creatureDrainEnergy = 1
+
+        self.bloodDecayRate = 1
+
+        self.creatureSmellRange = 3
+
+        self.windowSize = 500
+
+        self.creatureSize = 8
+        self.renderer = None
+
+        self.idCounter = 0
+
+        self.messageSize = 3
+
+        self.networkStore = CommNetworkStore(self.messageSize, capacity, self.rng)
+
+        self.foodSampler = FreeCellSampler(Lx, Ly, Lx * Ly, lambda tiles: self.foodArray.ravel()[tiles] == 0, self.rng)
+        self.creatureSampler = FreeCellSampler(Lx, Ly, Lx * Ly, self.occupancy.freeTiles, self.rng)
+
+        self.spawnCreatures()
+
+    # Adds creatures to the next free slots and returns those slots, their networks still have to be set
+    def addCreatures(self, xs, ys, energies, canMutates):
+
+        count = len(xs)
+        slots = np.arange(self.n, self.n + count)
+
+        self.xArray[slots] = xs
+        self.yArray[slots] = ys
+        self.energyArray[slots] = energies
+        self.canMutateArray[slots] = canMutates
+        self.toBeDestroyedArray[slots] = False
+        self.idArray[slots] = np.arange(self.idCounter, self.idCounter + count)
+        self.occupancy.ids[xs, ys] = slots
+        self.creatureSampler.occupy(count)
+
+        self.n += count
+        self.idCounter += count
+
+        return slots
+
+    def spawnFood(self):
+
+        xs, ys = self.foodSampler.sample(self.foodSpawnChance)
+
+        self.foodArray[xs, ys] = self.foodInitEnergy
+        self.foodSampler.occupy(len(xs))
+
+    def spawnCreatures(self):
+
+        xs, ys = self.creatureSampler.sample(self.creatureSpawnChance)
+        creatureSpawnCount = len(xs)
+
+        canMutates = self.rng.random(creatureSpawnCount) > 0.5
+
+        slots = self.addCreatures(xs, ys, np.full(creatureSpawnCount, self.creatureInitEnergy), canMutates)
+        self.networkStore.reset(slots)
+
+    def isFree(self, x, y):
+        return self.occupancy.isFree(x, y)
+
+    def getFreeDirections(self, x, y):
+        return self.occupancy.freeDirections(x, y)
+
+    def getOccupiedDirections(self, x, y):
+        return self.occupancy.occupiedDirections(x, y)
+
+    # Same rules as Creature.walk, applied to the creature in slot i standing on (x, y)
+    # foodValues is a list of 4 floats, the work per creature is done on Python scalars since numpy calls
+    # on 4 element arrays cost more than the arithmetic itself
+    def walk(self, i, x, y, onFood, foodValues):
+
+        freeDirections = self.occupancy.freeDirections(x, y)
+        if onFood or len(freeDirections) == 0:
+            return
+
+        if sum(foodValues) == 0:
+            dp = freeDirections[self.rng.integers(len(freeDirections))]
+        else:
+            maxFood = max(foodValues)
+            maxDirections = [step for step, food in zip(smellDirections, foodValues) if food == maxFood]
+            dp = maxDirections[self.rng.integers(len(maxDirections))]
+
+        xNew, yNew = x + dp[0], y + dp[1]
+        if self.occupancy.move(x, y, xNew, yNew):
+            self.xArray[i], self.yArray[i] = xNew, yNew
+
+        self.walkedArray[i] = True
+
+    # Food does not change while creatures walk and a creature only moves itself, so the smell values and
+    # positions of everyone are read before anyone walks
+    # Returns the positions of all creatures before the walk
+    def creatureWalk(self):
+
+        self.walkedArray[:self.n] = False
+
+        x, y = self.xArray[:self.n].copy(), self.yArray[:self.n].copy()
+        foodValues = smellFood(self.foodArray, x, y, self.creatureSmellRange).tolist()
+        onFood = (self.foodArray[x, y] > 0).tolist()
+
+        for i, (xi, yi) in enumerate(zip(x.tolist(), y.tolist())):
+            self.walk(i, xi, yi, onFood[i], foodValues[i])
+
+        return x, y
+
+    # Battles as in Creature.battleArea: right after its walk every walker battles the creatures next to it at that
+    # moment, unless one of the two is already doomed or the two have battled before during their lives
+    # The neighbours at the turn of every walker are rebuilt from the positions before and after the walk,
+    # all new exchanges are evaluated in one batch and their outcomes are then applied in walk order
+    def creatureBattle(self, xStart, yStart):
+
+        walkers = np.flatnonzero(self.walkedArray[:self.n])
+
+        if len(walkers) == 0:
+            return
+
+        # Creatures before a walker in the walk order stand on their new tile at its turn, later ones on their old tile
+        startIds = np.full_like(self.occupancy.padded, -1)
+        startIds[xStart + 1, yStart + 1] = np.arange(self.n)
+
+        tiles = self.occupancy.index(self.xArray[walkers], self.yArray[walkers])[:, None] + self.occupancy.offsets
+        newIds, oldIds = self.occupancy.flat[tiles], startIds.ravel()[tiles]
+        turn = walkers[:, None]
+        neighbours = np.where((newIds >= 0) & (newIds < turn), newIds, np.where(oldIds > turn, oldIds, -1))
+
+        # Candidate battles in walk order, pairs that battled in an earlier tick are left out
+        isOccupied = neighbours >= 0
+        slotsA = np.broadcast_to(turn, neighbours.shape)[isOccupied]
+        slotsB = neighbours[isOccupied].astype(int)
+        idsA, idsB = self.idArray[slotsA].tolist(), self.idArray[slotsB].tolist()
+
+        isNew = np.array([idB not in self.battledIds.get(idA, ()) for idA, idB in zip(idsA, idsB)], dtype=bool)
+
+        if not np.any(isNew):
+            return
+
+        slotsA, slotsB = slotsA[isNew], slotsB[isNew]
+        idsA, idsB = self.idArray[slotsA].tolist(), self.idArray[slotsB].tolist()
+        destroyB, destroyA = self.networkStore.battle(slotsA, slotsB)
+
+        doomed = set()
+        for a, b, idA, idB, killB, killA in zip(slotsA.tolist(), slotsB.tolist(), idsA, idsB, destroyB.tolist(), destroyA.tolist()):
+
+            # A pair shows up twice when both of them walked next to each other, only the first battle counts
+            if a in doomed or b in doomed or idB in self.battledIds.get(idA, ()):
+                continue
+
+            self.battledIds.setdefault(idA, set()).add(idB)
+            self.battledIds.setdefault(idB, set()).add(idA)
+
+            if killB:
+                doomed.add(b)
+            if killA:
+                doomed.add(a)
+
+        self.toBeDestroyedArray[list(doomed)] = True
+
+    def creatureFeeding(self):
+
+        x, y = self.xArray[:self.n], self.yArray[:self.n]
+
+        foodEnergy = self.foodArray[x, y]
+        energyDiff = np.minimum(foodEnergy, self.creatureEatEnergy)
+
+        self.energyArray[:self.n] += energyDiff
+        self.foodArray[x, y] -= energyDiff
+
+        self.foodSampler.release(np.count_nonzero((foodEnergy > 0) & (foodEnergy == energyDiff)))
+
+    def creatureEnergyDrain(self):
+        self.energyArray[:self.n] -= self.creatureDrainEnergy
+
+    # Every creature with enough energy places a child on a random free neighbouring tile, in order like in Simulation1
+    # Children with enough energy get their turn after all parents, as they are appended to the creatureList there
+    def creatureReplicate(self):
+
+        parents = np.flatnonzero(self.energyArray[:self.n] >= self.creatureOffspringEnergy)
+
+        while len(parents) > 0:
+
+            parents, xChildren, yChildren = self.placeChildren(parents)
+
+            childEnergies = self.energyArray[parents] / 2
+            canMutates = self.canMutateArray[parents]
+
+            self.energyArray[parents] = childEnergies
+            children = self.addCreatures(xChildren, yChildren, childEnergies, canMutates)
+            self.networkStore.copy(parents, children, canMutates)
+
+            parents = children[self.energyArray[children] >= self.creatureOffspringEnergy]
+
+    # Tiles of the children of the parents as if each parent picked a free tile in turn after the earlier ones
+    # The parents pick in rounds: a parent picks once no earlier parent that is still waiting can take one of its free
+    # tiles, so the parents of one round never compete and a parent never takes a tile an earlier parent could have picked
+    # Returns the parents that found a free tile, in order, with the tiles of their children
+    def placeChildren(self, parents):
+
+        steps = np.array(directions)
+        x, y = self.xArray[parents], self.yArray[parents]
+        tiles = self.occupancy.index(x[:, None] + steps[:, 0], y[:, None] + steps[:, 1])  # Neighbours in self.occupancy.flat
+
+        chosen = np.full(len(parents), -1)
+        waiting = np.arange(len(parents))
+
+        while len(waiting) > 0:
+
+            candidates = tiles[waiting]
+            isFree = (self.occupancy.flat[candidates] == -1) & ~np.isin(candidates, chosen[chosen >= 0])
+
+            hasSpace = np.any(isFree, axis=1)
+            waiting, candidates, isFree = waiting[hasSpace], candidates[hasSpace], isFree[hasSpace]
+
+            # The free tiles are listed in order of the waiting parents, so the first time a tile is listed is for the
+            # earliest parent that can take it. A parent has to wait if any of its free tiles belongs to an earlier one
+            rank = np.nonzero(isFree)[0]
+            _, first, inverse = np.unique(candidates[isFree], return_index=True, return_inverse=True)
+            mustWait = np.zeros(len(waiting), dtype=bool)
+            mustWait[rank[rank[first][inverse] != rank]] = True
+
+            picking = ~mustWait
+            isFree, freeCount = isFree[picking], np.sum(isFree[picking], axis=1)
+
+            # Pick the k-th free direction of each parent with k uniform over its free directions
+            k = (self.rng.random(len(freeCount)) * freeCount).astype(int)
+            direction = np.argmax(np.cumsum(isFree, axis=1) > k[:, None], axis=1)
+            chosen[waiting[picking]] = candidates[picking][np.arange(len(freeCount)), direction]
+
+            waiting = waiting[mustWait]
+
+        placed = chosen >= 0
+        xChildren, yChildren = np.divmod(chosen[placed], self.occupancy.width)
+
+        return parents[placed], xChildren - 1, yChildren - 1
+
+    def decayBlood(self):
+
+        self.bloodArray -= self.bloodDecayRate
+        self.bloodArray[self.bloodArray < 0] = 0
+
+    # Removes dead creatures and compacts the remaining ones in a single pass
+    def destroyCreatures(self):
+
+        n = self.n
+        x, y = self.xArray[:n], self.yArray[:n]
+        toBeDestroyed = self.toBeDestroyedArray[:n]
+        isDead = (self.energyArray[:n] <= 0) | toBeDestroyed
+
+        if not np.any(isDead):
+            return
+
+        np.add.at(self.bloodArray, (x[toBeDestroyed], y[toBeDestroyed]), 100)
+        self.occupancy.ids[x[isDead], y[isDead]] = -1
+        self.creatureSampler.release(np.count_nonzero(isDead))
+
+        for id in self.idArray[:n][isDead].tolist():
+            for otherId in self.battledIds.pop(id, ()):
+                if otherId in self.battledIds:
+                    self.battledIds[otherId].discard(id)
+
+        alive = np.flatnonzero(~isDead)
+        m = len(alive)
+
+        for array in [self.xArray, self.yArray, self.energyArray, self.canMutateArray, self.toBeDestroyedArray, self.idArray]:
+            array[:m] = array[alive]
+
+        self.networkStore.compact(alive)
+        self.n = m
+        self.occupancy.ids[self.xArray[:m], self.yArray[:m]] = np.arange(m)
+
+    def step(self):
+
+        self.spawnFood()
+
+        xStart, yStart = self.creatureWalk()
+        self.creatureBattle(xStart, yStart)
+        self.creatureFeeding()
+        self.creatureEnergyDrain()
+        self.creatureReplicate()
+        self.decayBlood()
+
+        commCreatureCount = int(np.sum(self.canMutateArray[:self.n]))
+        self.commCreatureCountLog.append(commCreatureCount)
+        self.muteCreatureCountLog.append(self.n - commCreatureCount)
+
+        self.destroyCreatures()
+
+    def draw(self):
+
+        self.window.clear()
+
+        if self.renderer is None:
+            self.renderer = GridRenderer(self.Lx, self.Ly, self.creatureSize)
+
+        n = self.n
+        self.renderer.drawGrid(tileColors(self.foodArray, self.bloodArray, self.foodInitEnergy))
+        self.renderer.drawCreatures(self.xArray[:n], self.yArray[:n],
+                                    creatureColors(self.energyArray[:n], self.canMutateArray[:n], self.foodInitEnergy))
+
+    # Without drawGame the simulation runs for the given number of steps without opening a window
+    def run(self, drawGame=True, steps=0):
+
+        if not drawGame:
+            for _ in range(steps):
+                self.step()
+            return
+
+        import pyglet
+
+        self.window = pyglet.window.Window(self.Lx * self.creatureSize, self.Ly * self.creatureSize)
+
+        @self.window.event
+        def on_draw():
+
+            self.step()
+            self.draw()
+
+        pyglet.app.run()
+
+        self.window.close()
@@ -3,11 +3,26 @@
 import numpy as np
 
 
+# Flat indices of the elements that mutate in an array with the given number of elements, each is picked with chance p
+# Only the picked elements are drawn: their number is binomial and their distinct positions are sampled directly
+def sampleMutations(size, p, rng):
+
+    count = rng.binomial(size, p)
+    selected = np.unique(rng.integers(size, size=count))
+
+    while len(selected) < count:
+        selected = np.unique(np.concatenate([selected, rng.integers(size, size=count - len(selected))]))
+
+    return selected
+
+
 class CommNetwork:
 
-    def __init__(self, messageSize):
+    # rng is the random generator of the simulation the network lives in, used for mutations
+    def __init__(self, messageSize, rng):
 
         self.messageSize = messageSize
+        self.rng = rng
         self.Mss = np.zeros((messageSize, messageSize))  # Weights from input message to output message
         self.Mso = np.zeros((1, messageSize))  # Weights from input message to attack signal
         self.Bs = np.zeros(messageSize)  # Bias on output message
@@ -18,7 +33,7 @@ class CommNetwork:
 
     def copy(self, doMutation):
 
-        child = CommNetwork(self.messageSize)
+        child = CommNetwork(self.messageSize, self.rng)
         child.Mss = np.copy(self.Mss)
         child.Mso = np.copy(self.Mso)
         child.Bs = np.copy(self.Bs)
@@ -48,8 +63,84 @@ class CommNetwork:
 
     def mutateArray(self, array, std, p):
 
-        selected = np.random.random(array.shape) < p
-        array[selected] += np.random.normal(0, std, np.sum(selected))
+        selected = sampleMutations(array.size, p, self.rng)
+        array.flat[selected] += self.rng.normal(0, std, len(selected))
+
+
+
+
+
+# Stores the networks of a whole population as stacked arrays indexed by creature slot
+# Row i of each array holds the same weights a CommNetwork would hold for the creature in slot i
+class CommNetworkStore:
+
+    def __init__(self, messageSize, capacity, rng):
+
+        self.messageSize = messageSize
+        self.rng = rng
+        self.Mss = np.zeros((capacity, messageSize, messageSize))  # Weights from input message to output message
+        self.Mso = np.zeros((capacity, 1, messageSize))  # Weights from input message to attack signal
+        self.Bs = np.zeros((capacity, messageSize))  # Bias on output message
+        self.Bo = np.zeros((capacity, 1))  #Bias on attack signal
+
+        self.p = 0.1
+        self.std = 0.5
+
+    def arrays(self):
+        return [self.Mss, self.Mso, self.Bs, self.Bo]
+
+    # Gives the networks in the given slots the initial (all zero) weights of a new CommNetwork
+    def reset(self, slots):
+
+        for array in self.arrays():
+            array[slots] = 0
+
+    # Copies the networks of the parent slots into the child slots, mutating the children where doMutation is True
+    def copy(self, parentSlots, childSlots, doMutation):
+
+        for array in self.arrays():
+            array[childSlots] = array[parentSlots]
+
+        mutatedSlots = childSlots[doMutation]
+        if len(mutatedSlots) > 0:
+            self.mutate(mutatedSlots, self.p, self.std)
+
+    # Moves the networks in the given slots to the front so that slot i holds the network previously at slots[i]
+    def compact(self, slots):
+
+        n = len(slots)
+        for array in self.arrays():
+            array[:n] = array[slots]
+
+    def mutate(self, slots, p, std):
+
+        for array in self.arrays():
+            block = array[slots]
+            self.mutateArray(block, std, p)
+            array[slots] = block
+
+    def mutateArray(self, array, std, p):
+
+        selected = sampleMutations(array.size, p, self.rng)
+        array.flat[selected] += self.rng.normal(0, std, len(selected))
+
+    # Plays out the message exchange of Creature.battle for every pair (slotsA[k], slotsB[k]) at once
+    # Returns for each pair whether A wants to destroy B and whether B wants to destroy A
+    def battle(self, slotsA, slotsB, rounds=3):
+
+        MssA, MsoA, BsA, BoA = [array[slotsA] for array in self.arrays()]
+        MssB, MsoB, BsB, BoB = [array[slotsB] for array in self.arrays()]
 
+        messageIn = None
+        messageOut = None
+        for _ in range(rounds):
+            if messageIn is None:
+                messageOut = BsA
+            else:
+                messageOut = np.einsum("pij,pj->pi", MssA, messageIn) + BsA
+            messageIn = np.einsum("pij,pj->pi", MssB, messageOut) + BsB
 
+        decisionA = np.einsum("pij,pj->pi", MsoA, messageIn) + BoA > 0
+        decisionB = np.einsum("pij,pj->pi", MsoB, messageOut) + BoB > 0
 
+        return decisionA[:, 0], decisionB[:, 0]
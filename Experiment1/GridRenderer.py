@@ -0,0 +1,111 @@
+#-----Imports-----#
+import numpy as np
+
+
+vertexSource = """#version 150 core
+    in vec2 position;
+    in vec4 colors;
+    out vec4 vertexColors;
+
+    uniform WindowBlock
+    {
+        mat4 projection;
+        mat4 view;
+    } window;
+
+    void main()
+    {
+        gl_Position = window.projection * window.view * vec4(position, 0.0, 1.0);
+        vertexColors = colors;
+    }
+"""
+
+fragmentSource = """#version 150 core
+    in vec4 vertexColors;
+    out vec4 finalColor;
+
+    void main()
+    {
+        finalColor = vertexColors;
+    }
+"""
+
+
+# Draws a Lx by Ly grid of tiles as one texture and the creatures on top of it from a single vertex list
+# Both are kept between frames, every frame only their contents are replaced
+class GridRenderer:
+
+    def __init__(self, Lx, Ly, tileSize, circleSegments=8):
+
+        # pyglet is only imported when drawing so that headless runs do not need a display
+        import pyglet
+        from pyglet import gl
+
+        self.pyglet = pyglet
+        self.gl = gl
+
+        self.Lx, self.Ly = Lx, Ly
+        self.tileSize = tileSize
+
+        # GL_NEAREST keeps the tiles sharp when the texture is scaled up to the window
+        self.texture = pyglet.image.Texture.create(Lx, Ly, min_filter=gl.GL_NEAREST, mag_filter=gl.GL_NEAREST)
+        self.pixels = np.zeros((Ly, Lx, 4), dtype=np.uint8)
+        self.pixels[:, :, 3] = 255
+
+        self.program = gl.current_context.create_program((vertexSource, 'vertex'), (fragmentSource, 'fragment'))
+
+        # Every creature is a fan of triangles around its centre
+        angles = 2 * np.pi * np.arange(circleSegments + 1) / circleSegments
+        rim = 0.5 * tileSize * np.stack([np.cos(angles), np.sin(angles)], axis=1)
+        self.circleOffsets = np.zeros((circleSegments, 3, 2), dtype=np.float32)
+        self.circleOffsets[:, 1] = rim[:-1]
+        self.circleOffsets[:, 2] = rim[1:]
+        self.circleOffsets = self.circleOffsets.reshape(-1, 2)
+        self.verticesPerCreature = len(self.circleOffsets)
+
+        self.capacity = 0
+        self.vertexList = None
+
+    # colors is a (Lx, Ly, 3) uint8 array with the color of every tile
+    def drawGrid(self, colors):
+
+        self.pixels[:, :, :3] = colors.transpose(1, 0, 2)
+
+        imageData = self.pyglet.image.ImageData(self.Lx, self.Ly, 'RGBA', self.pixels.tobytes())
+        self.texture.blit_into(imageData, 0, 0, 0)
+        self.texture.blit(0, 0, width=self.Lx * self.tileSize, height=self.Ly * self.tileSize)
+
+    # Grows the vertex list when there are more creatures than it can hold, unused vertices stay degenerate
+    def reserve(self, n):
+
+        if n <= self.capacity:
+            return
+
+        if self.vertexList is not None:
+            self.vertexList.delete()
+
+        self.capacity = max(n, 2 * self.capacity, 64)
+        self.vertexList = self.program.vertex_list(self.capacity * self.verticesPerCreature, self.gl.GL_TRIANGLES,
+                                                   position='f', colors='Bn')
+
+    # Draws a circle for every creature at tile (x[i], y[i]) with colors[i], colors is a (n, 3) uint8 array
+    def drawCreatures(self, x, y, colors):
+
+        n = len(x)
+        self.reserve(n)
+
+        k = self.verticesPerCreature
+        centers = self.tileSize * (np.stack([x, y], axis=1).astype(np.float32) + 0.5)
+
+        position = np.frombuffer(self.vertexList.position, dtype=np.float32).reshape(-1, k, 2)
+        position[:n] = centers[:, None, :] + self.circleOffsets[None, :, :]
+        position[n:] = 0
+
+        vertexColors = np.frombuffer(self.vertexList.colors, dtype=np.uint8).reshape(-1, k, 4)
+        vertexColors[:n, :, :3] = colors[:, None, :]
+        vertexColors[:n, :, 3] = 255
+        vertexColors[n:] = 0
+
+        self.program.use()
+        self.vertexList.draw(self.gl.GL_TRIANGLES)
+        self.program.stop()
@@ -0,0 +1,75 @@
+#-----Imports-----#
+import argparse
+import concurrent.futures
+import os
+import time
+import numpy as np
+
+#-----InternalImports-----#
+from Simulation1 import createSimulation
+
+
+# Random streams of the given runs, run i always gets child i of the root seed so runs never share a stream
+def runSeedSequences(seed, runs):
+
+    children = np.random.SeedSequence(seed).spawn(max(runs, default=-1) + 1)
+    return [children[run] for run in runs]
+
+# Runs one simulation without graphics and writes its population logs to a compressed .npz file
+def runHeadless(Lx, Ly, steps, engine, run, seedSequence, outputFolder):
+
+    sim = createSimulation(Lx, Ly, engine, seedSequence)
+
+    startTime = time.time()
+    sim.run(drawGame=False, steps=steps)
+    dt = time.time() - startTime
+
+    os.makedirs(outputFolder, exist_ok=True)
+    path = f"{outputFolder}/Run{run}.npz"
+
+    np.savez_compressed(path,
+                        commCreatureCountLog=np.array(sim.commCreatureCountLog, dtype=np.int32),
+                        muteCreatureCountLog=np.array(sim.muteCreatureCountLog, dtype=np.int32),
+                        Lx=Lx, Ly=Ly, steps=steps, engine=engine, seed=seedSequence.entropy, run=run)
+
+    return run, steps / dt, path
+
+# Runs one headless simulation per run index over a process pool, all of them derived from one root seed
+def runSeeds(Lx, Ly, steps, engine, runs, outputFolder, seed=0, workers=None):
+
+    startTime = time.time()
+
+    with concurrent.futures.ProcessPoolExecutor(workers) as executor:
+
+        futures = [executor.submit(runHeadless, Lx, Ly, steps, engine, run, seedSequence, outputFolder)
+                   for run, seedSequence in zip(runs, runSeedSequences(seed, runs))]
+
+        for future in concurrent.futures.as_completed(futures):
+            try:
+                run, ticksPerSecond, path = future.result()
+                print(f"Run {run}: {round(ticksPerSecond, 1)} ticks/s, saved to {path}")
+
+            except Exception as exc:
+                print(f"Simulation generated an exception: {exc}")
+
+    dt = time.time() - startTime
+    print(f"{len(runs)} runs of {steps} steps in {round(dt, 1)}s ({round(len(runs) * steps / dt, 1)} ticks/s overall)")
+
+
+if __name__ == "__main__":
+
+    parser = argparse.ArgumentParser(description="Run Experiment1 simulations without graphics")
+    parser.add_argument("--size", type=int, nargs=2, default=[100, 100], metavar=("LX", "LY"))
+    parser.add_argument("--steps", type=int, default=10000)
+    parser.add_argument("--engine", choices=["object", "array"], default="array")
+    parser.add_argument("--runs", type=int, default=1, help="Number of runs")
+    parser.add_argument("--firstRun", type=int, default=0)
+    parser.add_argument("--seed", type=int, default=0, help="Root seed every run derives its own random stream from")
+    parser.add_argument("--workers", type=int, default=None, help="Size of the process pool, defaults to the number of cores")
+    parser.add_argument("--output", default="HeadlessResults")
+    args = parser.parse_args()
+
+    Lx, Ly = args.size
+    runs = range(args.firstRun, args.firstRun + args.runs)
+
+    runSeeds(Lx, Ly, args.steps, args.engine, runs, args.output, args.seed, args.workers)
@@ -0,0 +1,102 @@
+#-----Imports-----#
+import numpy as np
+
+
+# Steps to the four neighbouring tiles, bit k of a direction mask stands for directions[k]
+directions = [[-1, 0], [1, 0], [0, -1], [0, 1]]
+
+# The directions whose bits are set, for every 4 bit mask
+maskDirections = [[directions[k] for k in range(4) if mask >> k & 1] for mask in range(16)]
+
+
+# Id of the creature on every tile of a Lx by Ly grid as int32, -1 where the tile is empty
+# The grid has a border of -2 tiles so that looking at a neighbour never needs a bounds check
+# Single tiles are read and written through a memoryview of the flat grid, which is much faster
+# from Python than indexing the array, whole groups of tiles are handled with the array itself
+class OccupancyGrid:
+
+    def __init__(self, Lx, Ly):
+
+        self.Lx, self.Ly = Lx, Ly
+        self.width = Ly + 2
+
+        self.padded = np.full((Lx + 2, Ly + 2), -2, dtype=np.int32)
+        self.padded[1:-1, 1:-1] = -1
+        self.setViews()
+
+        # Offsets in self.flat of the neighbours of a tile, in the order of directions
+        self.offsets = np.array([-self.width, self.width, -1, 1])
+
+    def setViews(self):
+
+        self.ids = self.padded[1:-1, 1:-1]  # View of the grid without its border
+        self.flat = self.padded.ravel()
+        self.cells = memoryview(self.flat)
+
+    # Memoryviews cannot be pickled, only the padded grid is stored and the views are recreated on loading
+    def __getstate__(self):
+
+        state = self.__dict__.copy()
+        for name in ["ids", "flat", "cells"]:
+            del state[name]
+
+        return state
+
+    def __setstate__(self, state):
+
+        self.__dict__.update(state)
+        self.setViews()
+
+    # Position in self.flat of tile (x, y), x and y can be arrays and may lie one tile outside the grid
+    def index(self, x, y):
+        return (x + 1) * self.width + y + 1
+
+    # The single tile methods repeat the index arithmetic instead of calling index, they run for every step of every creature
+    def get(self, x, y):
+        return self.cells[(x + 1) * self.width + y + 1]
+
+    def set(self, x, y, id):
+        self.cells[(x + 1) * self.width + y + 1] = id
+
+    def clear(self, x, y):
+        self.cells[(x + 1) * self.width + y + 1] = -1
+
+    # Tiles one step outside the grid are never free
+    def isFree(self, x, y):
+        return self.cells[(x + 1) * self.width + y + 1] == -1
+
+    # Moves the id on (x, y) to (xNew, yNew) if that tile is free, returns whether it moved
+    def move(self, x, y, xNew, yNew):
+
+        w, cells = self.width, self.cells
+        iNew = (xNew + 1) * w + yNew + 1
+        if cells[iNew] != -1:
+            return False
+
+        i = (x + 1) * w + y + 1
+        cells[iNew] = cells[i]
+        cells[i] = -1
+        return True
+
+    # Free neighbouring tiles of (x, y) as a list of [dx, dy] steps in the order of directions
+    def freeDirections(self, x, y):
+
+        w, cells = self.width, self.cells
+        i = (x + 1) * w + y + 1
+        return maskDirections[(cells[i - w] == -1) | ((cells[i + w] == -1) << 1) | ((cells[i - 1] == -1) << 2) | ((cells[i + 1] == -1) << 3)]
+
+    def occupiedDirections(self, x, y):
+
+        w, cells = self.width, self.cells
+        i = (x + 1) * w + y + 1
+        return maskDirections[(cells[i - w] >= 0) | ((cells[i + w] >= 0) << 1) | ((cells[i - 1] >= 0) << 2) | ((cells[i + 1] >= 0) << 3)]
+
+    # Ids of the four neighbours of every tile (x[k], y[k]) as a (n, 4) array, -2 for neighbours outside the grid
+    def neighbours(self, x, y):
+        return self.flat[self.index(x, y)[:, None] + self.offsets]
+
+    # Whether the tiles with the given flat indices into the unpadded Lx by Ly grid are free, for FreeCellSampler
+    def freeTiles(self, tiles):
+
+        x, y = np.divmod(tiles, self.Ly)
+        return self.flat[self.index(x, y)] == -1
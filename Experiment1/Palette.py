@@ -0,0 +1,26 @@
+#-----Imports-----#
+import numpy as np
+
+
+# Colors of the drawings of both engines
+cFood = np.array([50, 225, 30])
+cBlood = np.array([255, 0, 0])
+commCreatureColor = np.array([55, 55, 255])
+muteCreatureColor = np.array([200, 200, 0])
+
+# Color of every tile, food is drawn green and blood red, mixed where both are present
+def tileColors(foodArray, bloodArray, foodInitEnergy):
+
+    sFood = (foodArray / foodInitEnergy)[:, :, None]
+    sBlood = np.minimum(bloodArray / 100, 1)[:, :, None]
+
+    colors = sFood * cFood + sBlood * cBlood - 0.5 * sFood * sBlood * (cFood + cBlood)
+    return np.clip(colors, 0, 255).astype(np.uint8)
+
+# Color of every creature, dimmed when it is low on energy
+def creatureColors(energy, canMutate, foodInitEnergy):
+
+    s = np.clip(energy / foodInitEnergy, 0, 1)[:, None]
+    colors = np.where(canMutate[:, None], commCreatureColor, muteCreatureColor)
+
+    return (s * colors).astype(np.uint8)
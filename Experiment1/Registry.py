@@ -0,0 +1,51 @@
+#-----Imports-----#
+
+
+# List of the living creatures of a simulation together with the slot of every creature id in that list
+# Can be iterated and indexed like the plain list it replaces
+class CreatureRegistry:
+
+    def __init__(self):
+
+        self.creatures = []
+        self.slots = {}  # Creature id -> index in self.creatures
+
+    def __len__(self):
+        return len(self.creatures)
+
+    def __iter__(self):
+        return iter(self.creatures)
+
+    def __getitem__(self, i):
+        return self.creatures[i]
+
+    def __contains__(self, id):
+        return id in self.slots
+
+    def get(self, id):
+        return self.creatures[self.slots[id]]
+
+    def append(self, creature):
+
+        self.slots[creature.id] = len(self.creatures)
+        self.creatures.append(creature)
+
+    # Removes a single creature in O(1) by moving the last creature into its slot
+    def remove(self, creature):
+
+        slot = self.slots.pop(creature.id)
+        last = self.creatures.pop()
+
+        if last is not creature:
+            self.creatures[slot] = last
+            self.slots[last.id] = slot
+
+    # Removes many creatures in a single pass, the remaining creatures keep their order
+    def removeAll(self, creatures):
+
+        if len(creatures) == 0:
+            return
+
+        removedIds = {creature.id for creature in creatures}
+        self.creatures[:] = [creature for creature in self.creatures if creature.id not in removedIds]
+        self.slots = {creature.id: i for i, creature in enumerate(self.creatures)}
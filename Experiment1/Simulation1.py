@@ -1,12 +1,16 @@
 
 #-----Imports-----#
 import numpy as np
-import pyglet
-from pyglet import shapes
 import time
-import matplotlib.pyplot as plt
 
 from CommNetwork import CommNetwork
+from ArraySimulation import ArraySimulation
+from Palette import tileColors, creatureColors
+from GridRenderer import GridRenderer
+from SmellField import smellFood
+from Spawner import FreeCellSampler
+from Registry import CreatureRegistry
+from OccupancyGrid import OccupancyGrid
 
 class Creature:
 
@@ -18,23 +22,25 @@ class Creature:
         self.id = id
         self.network = network
         self.toBeDestroyed = False
-        self.battledCreatures = []
+        self.battledCreatures = set()  # Ids of living creatures this creature has battled
         self.canMutate = canMutate
 
-    def destroy(self, sim):
+    # With deferRemoval the caller is responsible for removing the creature from sim.creatureList
+    def destroy(self, sim, deferRemoval=False):
 
         if self.toBeDestroyed:
             sim.bloodArray[self.x, self.y] += 100
 
-        sim.creatureArray[self.x,self.y] = None
+        sim.occupancy.clear(self.x, self.y)
+        sim.creatureSampler.release()
 
-        placement = 0
-        for i, creature in enumerate(sim.creatureList):
-            if self.id == creature.id:
-                placement = i
-                break
+        # Forget this creature in the battle records of everyone it battled, so the records only hold living creatures
+        for id in self.battledCreatures:
+            if id in sim.creatureList:
+                sim.creatureList.get(id).battledCreatures.discard(self.id)
 
-        del sim.creatureList[placement]
+        if not deferRemoval:
+            sim.creatureList.remove(self)
 
 
 
@@ -44,15 +50,15 @@ class Creature:
         if xNew < 0 or yNew < 0 or xNew >= sim.Lx or yNew >= sim.Ly:
             return
 
-        if sim.creatureArray[xNew, yNew] != None:
+        if not sim.occupancy.isFree(xNew, yNew):
             return
 
-        sim.creatureArray[self.x, self.y] = None
+        sim.occupancy.clear(self.x, self.y)
 
         self.x = xNew
         self.y = yNew
 
-        sim.creatureArray[xNew, yNew] = self
+        sim.occupancy.set(xNew, yNew, self.id)
 
     def eat(self, sim, eatEnergy):
 
@@ -65,36 +71,23 @@ class Creature:
         self.energy += energyDiff
         sim.foodArray[self.x, self.y] -= energyDiff
 
+        if foodEnergy > 0 and sim.foodArray[self.x, self.y] == 0:
+            sim.foodSampler.release()
 
-    def walk(self, sim):
+
+    # foodValues holds the food smelled up, down, right and left, see SmellField.smellFood
+    def walk(self, sim, foodValues):
 
         freeDirections = self.getFreeDirections(sim)
         if sim.foodArray[self.x, self.y] > 0 or len(freeDirections) == 0:
             return
 
-        r = sim.creatureSmellRange
-        xmin, xmax = max(0, self.x - r), min(sim.Lx-1, self.x + r + 1)
-        ymin, ymax = max(0, self.y - r), min(sim.Ly-1, self.y + r + 1)
-
-        foods = sim.foodArray
-
-        sUp = np.sum(foods[xmin:xmax, self.y+1:ymax])
-        sDown = np.sum(foods[xmin:xmax, ymin:self.y])
-        sRight = np.sum(foods[self.x+1:xmax, ymin:ymax])
-        sLeft = np.sum(foods[xmin:self.x, ymin:ymax])
-
-        # sUp = np.sum(foods[xmin:xmax, self.y+1:ymax] * (sim.creatureArray[xmin:xmax, self.y+1:ymax] == None))
-        # sDown = np.sum(foods[xmin:xmax, ymin:self.y] * (sim.creatureArray[xmin:xmax, ymin:self.y] == None))
-        # sRight = np.sum(foods[self.x+1:xmax, ymin:ymax] * (sim.creatureArray[self.x+1:xmax, ymin:ymax] == None))
-        # sLeft = np.sum(foods[xmin:self.x, ymin:ymax] * (sim.creatureArray[xmin:self.x, ymin:ymax] == None))
-        foodValues = np.array([sUp, sDown, sRight, sLeft])
-
         directions = np.array([[0, 1], [0, -1], [1, 0], [-1, 0]])
         if np.sum(foodValues) == 0:
-            dp = freeDirections[np.random.randint(len(freeDirections))]
+            dp = freeDirections[sim.rng.integers(len(freeDirections))]
         else:
             maxDirections = directions[foodValues == np.amax(foodValues)]
-            dp = np.array(maxDirections[np.random.randint(len(maxDirections))])
+            dp = np.array(maxDirections[sim.rng.integers(len(maxDirections))])
 
         self.move(self.x+dp[0], self.y+dp[1], sim)
         self.battleArea(sim)
@@ -110,7 +103,7 @@ class Creature:
         if len(directions) == 0:
             return
 
-        direction = directions[np.random.randint(len(directions))]
+        direction = directions[sim.rng.integers(len(directions))]
 
         xChild, yChild = self.x+direction[0], self.y+direction[1]
         childEnergy = self.energy / 2
@@ -119,37 +112,15 @@ class Creature:
         self.energy = childEnergy
 
     def getFreeDirections(self, sim):
-
-        directions = []
-        if self.x > 0 and sim.creatureArray[self.x-1, self.y] == None:
-            directions.append([-1,0])
-        if self.x < sim.Lx-1 and sim.creatureArray[self.x+1, self.y] == None:
-            directions.append([1,0])
-        if self.y > 0 and sim.creatureArray[self.x, self.y-1] == None:
-            directions.append([0,-1])
-        if self.y < sim.Ly-1 and sim.creatureArray[self.x, self.y+1] == None:
-            directions.append([0,1])
-
-        return directions
+        return sim.occupancy.freeDirections(self.x, self.y)
 
     def getOccupiedDirections(self, sim):
-
-        directions = []
-        if self.x > 0 and sim.creatureArray[self.x-1, self.y] != None:
-            directions.append([-1,0])
-        if self.x < sim.Lx-1 and sim.creatureArray[self.x+1, self.y] != None:
-            directions.append([1,0])
-        if self.y > 0 and sim.creatureArray[self.x, self.y-1] != None:
-            directions.append([0,-1])
-        if self.y < sim.Ly-1 and sim.creatureArray[self.x, self.y+1] != None:
-            directions.append([0,1])
-
-        return directions
+        return sim.occupancy.occupiedDirections(self.x, self.y)
 
     def battleArea(self, sim):
 
         for direction in self.getOccupiedDirections(sim):
-            otherCreature = sim.creatureArray[self.x+direction[0], self.y+direction[1]]
+            otherCreature = sim.creatureList.get(sim.occupancy.get(self.x+direction[0], self.y+direction[1]))
             if otherCreature.id not in self.battledCreatures:
                 self.battle(otherCreature)
 
@@ -167,8 +138,8 @@ class Creature:
         otherCreature.toBeDestroyed = self.network.getDecision(messageIn)
         self.toBeDestroyed = otherCreature.network.getDecision(messageOut)
 
-        self.battledCreatures.append(otherCreature.id)
-        otherCreature.battledCreatures.append(self.id)
+        self.battledCreatures.add(otherCreature.id)
+        otherCreature.battledCreatures.add(self.id)
 
 
 
@@ -176,12 +147,15 @@ class Creature:
 class Simulation:
 
 
-    def __init__(self, Lx, Ly):
+    def __init__(self, Lx, Ly, seed=None):
 
         self.Lx, self.Ly = Lx, Ly
 
-        self.creatureArray = np.empty((Lx,Ly), dtype=Creature)
-        self.creatureList = []
+        # All randomness of the run comes from this generator, seed can be an int or a SeedSequence
+        self.rng = np.random.default_rng(seed)
+
+        self.occupancy = OccupancyGrid(Lx, Ly)  # Id of the creature on every tile
+        self.creatureList = CreatureRegistry()
         self.foodArray = np.zeros((Lx,Ly), dtype=float)
         self.bloodArray = np.zeros((Lx, Ly), dtype=float)
 
@@ -205,49 +179,41 @@ class Simulation:
         self.windowSize = 500
 
         self.creatureSize = 8
+        self.renderer = None
 
         self.idCounter = 0
 
         self.messageSize = 3
 
+        self.foodSampler = FreeCellSampler(Lx, Ly, Lx * Ly, lambda tiles: self.foodArray.ravel()[tiles] == 0, self.rng)
+        self.creatureSampler = FreeCellSampler(Lx, Ly, Lx * Ly, self.occupancy.freeTiles, self.rng)
 
         self.spawnCreatures()
 
     def addCreature(self, x, y, energy, network, canMutate):
 
         creature = Creature(energy, x, y, self.idCounter, network, canMutate)
-        self.creatureArray[x, y] = creature
+        self.occupancy.set(x, y, creature.id)
         self.creatureList.append(creature)
+        self.creatureSampler.occupy()
         self.idCounter += 1
 
     def spawnFood(self):
 
-        emptySpots = np.array(np.where(self.foodArray == 0))
-        emptySpotCount = len(emptySpots[0, :])
-
-        foodSpawnCount = np.random.binomial(emptySpotCount, self.foodSpawnChance)
-
-        filledIndices = np.random.choice(range(emptySpotCount), foodSpawnCount, False)
+        xs, ys = self.foodSampler.sample(self.foodSpawnChance)
 
-        for i in filledIndices:
-            x, y = emptySpots[0, i], emptySpots[1, i]
-            self.foodArray[x, y] = self.foodInitEnergy
+        self.foodArray[xs, ys] = self.foodInitEnergy
+        self.foodSampler.occupy(len(xs))
 
 
     def spawnCreatures(self):
 
-        emptySpots = np.array(np.where(self.creatureArray == None))
-        emptySpotCount = len(emptySpots[0,:])
+        xs, ys = self.creatureSampler.sample(self.creatureSpawnChance)
 
-        creatureSpawnCount = np.random.binomial(emptySpotCount, self.creatureSpawnChance)
+        for x, y in zip(xs, ys):
+            canMutate = self.rng.random() > 0.5
 
-        filledIndices = np.random.choice(range(emptySpotCount), creatureSpawnCount, False)
-
-        for i in filledIndices:
-            x, y = emptySpots[0, i], emptySpots[1, i]
-            canMutate = np.random.random() > 0.5
-
-            self.addCreature(x, y, self.creatureInitEnergy, CommNetwork(self.messageSize), canMutate)
+            self.addCreature(x, y, self.creatureInitEnergy, CommNetwork(self.messageSize, self.rng), canMutate)
 
     def creatureFeeding(self):
 
@@ -259,10 +225,15 @@ class Simulation:
         for creature in self.creatureList:
             creature.energy -= self.creatureDrainEnergy
 
+    # Food does not change while creatures walk, so all smell values are computed from one integral image
     def creatureWalk(self):
 
-        for creature in self.creatureList:
-            creature.walk(self)
+        x = [creature.x for creature in self.creatureList]
+        y = [creature.y for creature in self.creatureList]
+        foodValues = smellFood(self.foodArray, x, y, self.creatureSmellRange)
+
+        for creature, creatureFoodValues in zip(self.creatureList, foodValues):
+            creature.walk(self, creatureFoodValues)
 
     def creatureReplicate(self):
 
@@ -302,91 +273,86 @@ class Simulation:
         self.commCreatureCountLog.append(commCreatureCount)
 
         for creature in creaturesToDestroy:
-            creature.destroy(self)
+            creature.destroy(self, deferRemoval=True)
+
+        self.creatureList.removeAll(creaturesToDestroy)
 
     def draw(self):
 
         self.window.clear()
 
-        batch = pyglet.graphics.Batch()
-
-        size = self.creatureSize
+        if self.renderer is None:
+            self.renderer = GridRenderer(self.Lx, self.Ly, self.creatureSize)
 
-        cFood = (50, 225, 30)
-        cBlood = (255, 0, 0)
+        x = np.array([creature.x for creature in self.creatureList], dtype=int)
+        y = np.array([creature.y for creature in self.creatureList], dtype=int)
+        energy = np.array([creature.energy for creature in self.creatureList], dtype=float)
+        canMutate = np.array([creature.canMutate for creature in self.creatureList], dtype=bool)
 
-        foodDrawings = []
-        for x in range(self.Lx):
-            for y in range(self.Ly):
+        self.renderer.drawGrid(tileColors(self.foodArray, self.bloodArray, self.foodInitEnergy))
+        self.renderer.drawCreatures(x, y, creatureColors(energy, canMutate, self.foodInitEnergy))
 
-                sFood = self.foodArray[x, y] / self.foodInitEnergy
-                sBlood = np.amin([self.bloodArray[x, y] / 100, 1])
+    # Without drawGame the simulation runs for the given number of steps without opening a window
+    def run(self, drawGame=True, steps=0):
 
+        if not drawGame:
+            for _ in range(steps):
+                self.step()
+            return
 
-                if sFood + sBlood > 0:
-                    color = [int(sFood * cFood[i] + sBlood * cBlood[i] - 0.5 * sFood * sBlood * (cFood[i] + cBlood[i])) for i in range(len(cFood))]
-                else:
-                    continue
+        import pyglet
 
-                foodDrawing = shapes.Rectangle(size * x, size * y, size, size, color=color, batch=batch)
-                foodDrawings.append(foodDrawing)
+        self.window = pyglet.window.Window(self.Lx * self.creatureSize, self.Ly * self.creatureSize)
 
-        creatureDrawings = []
-        commCreatureColor = [55,55,255]
-        muteCreatureColor = [200, 200, 0]
-        for creature in self.creatureList:
-            s = min(1, creature.energy / self.foodInitEnergy)
+        @self.window.event
+        def on_draw():
 
-            if creature.canMutate:
-                color = commCreatureColor
-            else:
-                color = muteCreatureColor
-            creatureColor = [int(s * color[i]) for i in range(len(color))]
-            creatureDrawing = shapes.Circle(size * (creature.x+0.5), size * (creature.y+0.5), 0.5*size, color=creatureColor, batch=batch)
+            self.step()
+            self.draw()
 
-            creatureDrawings.append(creatureDrawing)
+        pyglet.app.run()
 
-        batch.draw()
+        self.window.close()
 
-    def run(self, drawGame=True):
 
-        if (drawGame):
 
-            self.window = pyglet.window.Window(self.Lx * self.creatureSize, self.Ly * self.creatureSize)
 
-            @self.window.event
-            def on_draw():
+# "object" keeps every creature as a Creature, "array" uses the struct of arrays engine
+def createSimulation(Lx, Ly, engine="object", seed=None):
 
-                self.step()
-                self.draw()
+    if engine == "array":
+        return ArraySimulation(Lx, Ly, seed)
+    else:
+        return Simulation(Lx, Ly, seed)
 
-            pyglet.app.run()
+def plotPopulation(sim):
 
-        if (drawGame):
-            self.window.close()
+    import matplotlib.pyplot as plt
 
+    plt.figure()
 
+    t = range(len(sim.commCreatureCountLog))
 
+    plt.plot(t, sim.commCreatureCountLog, color = "blue", label="comm count")
+    plt.plot(t, sim.muteCreatureCountLog, color = "orange", label="mute count")
 
-sim = Simulation(100, 100)
+    plt.xlabel("Timesteps")
+    plt.ylabel("Creature count")
 
-sim.run()
+    plt.xlim(0, len(t)-1)
+    plt.ylim(0, 1.2 * max(np.amax(sim.commCreatureCountLog), np.amax(sim.muteCreatureCountLog)))
 
-plt.figure()
+    plt.grid(linestyle="--", alpha = 0.5)
 
-t = range(len(sim.commCreatureCountLog))
+    plt.legend()
 
-plt.plot(t, sim.commCreatureCountLog, color = "blue", label="comm count")
-plt.plot(t, sim.muteCreatureCountLog, color = "orange", label="mute count")
+    plt.show()
 
-plt.xlabel("Timesteps")
-plt.ylabel("Creature count")
 
-plt.xlim(0, len(t)-1)
-plt.ylim(0, 1.2 * max(np.amax(sim.commCreatureCountLog), np.amax(sim.muteCreatureCountLog)))
+if __name__ == "__main__":
 
-plt.grid(linestyle="--", alpha = 0.5)
+    sim = createSimulation(100, 100, "object")
 
-plt.legend()
+    sim.run()
 
-plt.show()
+    plotPopulation(sim)
@@ -0,0 +1,56 @@
+#-----Imports-----#
+import numpy as np
+
+
+# Element i is the average of the window values before i, array[max(0, i-window):i], the first element is nan
+# Same values as averaging every slice separately, but from one cumulative sum
+def slidingWindow(array, window):
+
+    array = np.asarray(array, dtype=float)
+
+    prefixSums = np.zeros(len(array) + 1)
+    np.cumsum(array, out=prefixSums[1:])
+
+    i = np.arange(len(array))
+    start = np.maximum(0, i - window)
+
+    with np.errstate(invalid='ignore'):
+        return (prefixSums[i] - prefixSums[start]) / (i - start)
+
+
+# Mean and standard deviation of equally long runs, updated one run at a time with Welford's algorithm
+# so only a single run has to be in memory
+class RunStatistics:
+
+    def __init__(self):
+
+        self.count = 0
+        self.mean = None
+        self.m2 = None  # Sum of squared differences from the current mean
+
+    def add(self, run):
+
+        run = np.asarray(run, dtype=float)
+
+        if self.mean is None:
+            self.mean = np.zeros_like(run)
+            self.m2 = np.zeros_like(run)
+
+        self.count += 1
+        delta = run - self.mean
+        self.mean += delta / self.count
+        self.m2 += delta * (run - self.mean)
+
+    # Population standard deviation like np.std
+    def std(self):
+        return np.sqrt(self.m2 / self.count)
+
+
+# Mean and standard deviation over runs of the log with the given name in a ResultSet, reading one run at a time
+def runStatistics(resultSet, name):
+
+    statistics = RunStatistics()
+    for column in resultSet.columns(name):
+        statistics.add(column)
+
+    return statistics.mean, statistics.std()
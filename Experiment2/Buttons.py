@@ -1,7 +1,5 @@
 
 #-----Imports-----#
-import pyglet
-from pyglet import shapes
 
 class Slider:
 
@@ -16,8 +14,12 @@ class Slider:
         self.text = text
 
 
+    # pyglet is only imported when drawing so that headless runs do not need it
     def draw(self, batch):
 
+        import pyglet
+        from pyglet import shapes
+
         R = 0.5 * self.height
         Bh = self.height
         Bw = self.width - self.height
@@ -53,4 +55,12 @@ class Slider:
                 self.y < y < self.y + self.height)
 
     def onClick(self, sim):
-        self.on = not self.on
\ No newline at end of file
+        self.on = not self.on
+
+
+# Slider that switches the phase profiler of the simulation on and off
+class ProfilerSlider(Slider):
+
+    def onClick(self, sim):
+        super().onClick(sim)
+        sim.profiler.enabled = self.on
\ No newline at end of file
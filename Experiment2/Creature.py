@@ -5,73 +5,40 @@ import numpy as np
 
 class Creature:
 
-    def __init__(self, energy, x, y, network, gen, id):
+    def __init__(self, energy, x, y, gen, id, slot):
 
         self.energy = energy
         self.x = x
         self.y = y
-        self.network = network
+        self.slot = slot  # Slot of the network and memory of the creature in sim.networkStore
         self.id = id
         self.gen = gen
         self.destination = np.array([0, 0])
         self.hasDestination = False
         self.toBeDestroyed = False
 
-    def destroy(self, sim):
+    # With deferRemoval the caller is responsible for removing the creature from sim.creatureList
+    def destroy(self, sim, deferRemoval=False):
 
-        sim.creatureArray[self.x,self.y] = None
+        sim.occupancy.clear(self.x, self.y)
+        sim.creatureSampler.release()
+        sim.networkStore.remove(self.slot)
 
-        placement = 0
-        for i, creature in enumerate(sim.creatureList):
-            if self.id == creature.id:
-                placement = i
-                break
-
-        del sim.creatureList[placement]
+        if not deferRemoval:
+            sim.creatureList.remove(self)
 
 
+    # Creatures only step to neighbouring tiles, the border of the occupancy grid keeps them inside the map
     def move(self, xNew, yNew, sim):
 
-        if xNew < 0 or yNew < 0 or xNew >= sim.Lx or yNew >= sim.Ly:
-            return
-
-        if sim.creatureArray[xNew, yNew] != None:
+        if not sim.occupancy.move(self.x, self.y, xNew, yNew):
             return
 
-        sim.creatureArray[self.x, self.y] = None
-
         self.x = xNew
         self.y = yNew
 
-        sim.creatureArray[xNew, yNew] = self
-
-        self.shareMemory(sim)
-
-    def eat(self, sim):
-
-        if sim.hasFoodArray[self.x, self.y]:
-
-
-            color = sim.foodColorArray[self.x, self.y]
-            d = self.network.decide(color)
-            dE = sim.getFoodEnergy(color)
-
-            if dE > 0:
-                sim.posEnergyEatenLog.add(d)
-            else:
-                sim.negEnergyEatenLog.add(d)
-
-            if d:
-                self.energy += dE
-                self.network.updateMemory(color, dE)
-                sim.energyEatenLog.add(dE)
-
-            sim.hasFoodArray[self.x, self.y] = False
-            sim.foodChunkManager.remove(self.x, self.y)
-
-
-
-    def walk(self, sim):
+    # nearestFood is the closest food within smell range of the creature, or None if there is none
+    def walk(self, sim, nearestFood):
 
         pos = np.array([self.x, self.y])
 
@@ -90,25 +57,13 @@ class Creature:
         # If no current destination, find new destination
         if not self.hasDestination:
 
-            # Get all nearby food
-            nearbyFoodPositions = sim.foodChunkManager.getNeighbours(self.x, self.y)
-
-            # If no nearby food exists, walk randomly
-            if len(nearbyFoodPositions) == 0:
-                dp = freeDirections[np.random.randint(len(freeDirections))]
-                return self.move(self.x+dp[0], self.y+dp[1], sim)
-
-            # Find closest food
-            dSquared = [np.sum((pos - np.array(posFood))**2) for posFood in nearbyFoodPositions]
-            iMin = np.argmin(dSquared)
-
-            # If closest food is outside range, walk randomly
-            if dSquared[iMin] > sim.creatureSmellRange**2:
-                dp = freeDirections[np.random.randint(len(freeDirections))]
+            # If no food is within range, walk randomly
+            if nearestFood is None:
+                dp = freeDirections[sim.rng.integers(len(freeDirections))]
                 return self.move(self.x+dp[0], self.y+dp[1], sim)
             # Otherwise set closest food as destination
             else:
-                self.destination = nearbyFoodPositions[iMin]
+                self.destination = nearestFood
                 self.hasDestination = True
 
         dx, dy = self.destination - pos
@@ -150,70 +105,42 @@ class Creature:
 
         directions = np.array([[0, 1], [0, -1], [1, 0], [-1, 0]])
         if np.sum(foodValues) == 0:
-            dp = freeDirections[np.random.randint(len(freeDirections))]
+            dp = freeDirections[sim.rng.integers(len(freeDirections))]
         else:
             maxDirections = directions[foodValues == np.amax(foodValues)]
-            dp = np.array(maxDirections[np.random.randint(len(maxDirections))])
+            dp = np.array(maxDirections[sim.rng.integers(len(maxDirections))])
 
         self.move(self.x+dp[0], self.y+dp[1], sim)
 
-    def shareMemory(self, sim):
-
-        for direction in self.getOccupiedDirections(sim):
-            otherCreature = sim.creatureArray[self.x+direction[0], self.y+direction[1]]
-
-            if np.random.random() < sim.memoryShareChance:
-                otherCreature.network.memory = np.copy(self.network.memory)
-
-
+    # Places a child next to the creature, its genome is copied into its slot afterwards by sim.creatureReplicate
     def replicate(self, sim):
 
         if self.energy < sim.creatureOffspringEnergy:
-            return
+            return None
 
         directions = self.getFreeDirections(sim)
 
         if len(directions) == 0:
-            return
+            return None
 
-        direction = directions[np.random.randint(len(directions))]
+        direction = directions[sim.rng.integers(len(directions))]
 
         xChild, yChild = self.x+direction[0], self.y+direction[1]
         childEnergy = self.energy / 2
-        childNetwork = self.network.copy()
 
-        sim.addCreature(xChild, yChild, childEnergy, self.gen + 1, childNetwork)
+        child = sim.addChild(self, xChild, yChild, childEnergy)
 
         self.energy = childEnergy
 
+        return child
+
+    # (x, y) is at most one tile away from the grid
     def isFree(self, x, y, sim):
-        return x >= 0 and x <= sim.Lx-1 and y >= 0 and y <= sim.Ly-1 and sim.creatureArray[x, y] == None
+        return sim.occupancy.isFree(x, y)
 
 
     def getFreeDirections(self, sim):
-
-        directions = []
-        if self.x > 0 and sim.creatureArray[self.x-1, self.y] == None:
-            directions.append([-1,0])
-        if self.x < sim.Lx-1 and sim.creatureArray[self.x+1, self.y] == None:
-            directions.append([1,0])
-        if self.y > 0 and sim.creatureArray[self.x, self.y-1] == None:
-            directions.append([0,-1])
-        if self.y < sim.Ly-1 and sim.creatureArray[self.x, self.y+1] == None:
-            directions.append([0,1])
-
-        return directions
+        return sim.occupancy.freeDirections(self.x, self.y)
 
     def getOccupiedDirections(self, sim):
-
-        directions = []
-        if self.x > 0 and sim.creatureArray[self.x-1, self.y] != None:
-            directions.append([-1,0])
-        if self.x < sim.Lx-1 and sim.creatureArray[self.x+1, self.y] != None:
-            directions.append([1,0])
-        if self.y > 0 and sim.creatureArray[self.x, self.y-1] != None:
-            directions.append([0,-1])
-        if self.y < sim.Ly-1 and sim.creatureArray[self.x, self.y+1] != None:
-            directions.append([0,1])
-
-        return directions
\ No newline at end of file
+        return sim.occupancy.occupiedDirections(self.x, self.y)
\ No newline at end of file
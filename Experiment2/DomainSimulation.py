@@ -0,0 +1,431 @@
+#-----Imports-----#
+import multiprocessing
+from multiprocessing import shared_memory
+import numpy as np
+
+#-----InternalImports-----#
+from Simulation2 import Simulation
+from Creature import Creature
+from Spawner import FreeCellSampler
+from Settings import Results
+from Saver import Log
+
+
+# Marks tiles that are taken but hold no creature of the strip itself: creatures of the neighbouring strips
+# seen in the halo and the old tiles of creatures that are being handed over
+reserved = -3
+
+
+# Per tile state of the whole world in shared memory, every strip writes its own rows after each step
+# Given the names of existing blocks it attaches to the blocks created by the coordinating process
+class SharedWorld:
+
+    def __init__(self, Lx, Ly, names=None):
+
+        shapes = {"occupied": ((Lx, Ly), bool), "hasFood": ((Lx, Ly), bool), "foodColor": ((Lx, Ly, 3), float)}
+
+        self.blocks = {}
+        for name, (shape, dtype) in shapes.items():
+
+            size = int(np.prod(shape)) * np.dtype(dtype).itemsize
+            if names is None:
+                block = shared_memory.SharedMemory(create=True, size=size)
+            else:
+                block = shared_memory.SharedMemory(name=names[name])
+
+            self.blocks[name] = block
+            setattr(self, name, np.ndarray(shape, dtype=dtype, buffer=block.buf))
+
+        if names is None:
+            self.occupied[:] = False
+            self.hasFood[:] = False
+            self.foodColor[:] = 0
+
+    def names(self):
+        return {name: block.name for name, block in self.blocks.items()}
+
+    def close(self):
+
+        # The arrays point into the blocks and have to go first
+        del self.occupied, self.hasFood, self.foodColor
+        for block in self.blocks.values():
+            block.close()
+
+    def unlink(self):
+        for block in self.blocks.values():
+            block.unlink()
+
+
+# Simulation of the rows x0..x1-1 of a Lx by Ly world, run by one worker process
+# The local grid also holds up to halo rows of the neighbouring strips on both sides, copied from the shared world
+# at the start of every step so that creatures see the food and creatures next to their strip
+# Creatures may only walk into the first halo row, they are then handed over to the strip that owns it.
+# After walking the halo is closed and nothing else happens outside the strip
+class StripSimulation(Simulation):
+
+    def __init__(self, Lx, Ly, x0, x1, world, seed=None, halo=3, settings=None):
+
+        self.world = world
+        self.x0, self.x1 = x0, x1
+        self.offset = max(0, x0 - halo)  # Global x of local row 0
+        self.xMin, self.xMax = x0 - self.offset, x1 - self.offset  # Local rows owned by the strip
+
+        localLx = min(Lx, x1 + halo) - self.offset
+        self.owned = np.zeros((localLx, Ly), dtype=bool)
+        self.owned[self.xMin:self.xMax] = True
+
+        # Local and global rows of the halo on either side
+        self.haloRows = [(slice(0, self.xMin), slice(self.offset, x0)),
+                         (slice(self.xMax, localLx), slice(x1, self.offset + localLx))]
+
+        self.emigrants = []
+        self.immigrants = []
+        self.movedIds = set()
+
+        super().__init__(localLx, Ly, seed, settings)
+
+        if self.creatureSmellRange > halo:
+            raise ValueError(f"Creatures smell {self.creatureSmellRange} tiles but the halo is only {halo} rows")
+
+        self.closeHalo()
+        self.writeWorld()
+
+    # Food and creatures only spawn on tiles of the strip
+    def createSamplers(self):
+
+        owned = self.owned.ravel()
+        ownedCount = int(np.count_nonzero(owned))
+
+        self.foodSampler = FreeCellSampler(self.Lx, self.Ly, ownedCount, lambda tiles: owned[tiles] & ~self.hasFoodArray.ravel()[tiles], self.rng)
+        self.creatureSampler = FreeCellSampler(self.Lx, self.Ly, ownedCount, lambda tiles: owned[tiles] & self.occupancy.freeTiles(tiles), self.rng)
+
+    # Copies the food and creatures of the neighbouring strips next to this one into the halo
+    def openHalo(self):
+
+        for local, world in self.haloRows:
+
+            shared = self.world.hasFood[world]
+            current = self.hasFoodArray[local]
+
+            for x, y in zip(*np.nonzero(current & ~shared)):
+                self.foodChunkManager.remove(x + local.start, y)
+
+            xs, ys = np.nonzero(shared & ~current)
+            self.foodChunkManager.addMany(xs + local.start, ys)
+
+            self.hasFoodArray[local] = shared
+            self.foodColorArray[local] = self.world.foodColor[world]
+            self.occupancy.ids[local] = np.where(self.world.occupied[world], reserved, -1)
+
+    # Outside the walk phase the halo is as unreachable as the border of the world
+    def closeHalo(self):
+        for local, _ in self.haloRows:
+            self.occupancy.ids[local] = -2
+
+    def writeWorld(self):
+
+        own, rows = slice(self.xMin, self.xMax), slice(self.x0, self.x1)
+
+        self.world.occupied[rows] = self.occupancy.ids[own] >= 0
+        self.world.hasFood[rows] = self.hasFoodArray[own]
+        self.world.foodColor[rows] = self.foodColorArray[own]
+
+    # Like Simulation.creatureWalk, a creature that steps into the halo keeps its old tile reserved until the
+    # neighbouring strip has accepted it
+    def creatureWalk(self):
+
+        xs = np.array([creature.x for creature in self.creatureList], dtype=int)
+        ys = np.array([creature.y for creature in self.creatureList], dtype=int)
+        hasNearestFood, nearestFood = self.foodChunkManager.nearest(xs, ys, self.creatureSmellRange)
+
+        self.emigrants = []
+        for i, creature in enumerate(self.creatureList):
+            creature.walk(self, nearestFood[i] if hasNearestFood[i] else None)
+
+            if not self.xMin <= creature.x < self.xMax:
+                self.occupancy.set(xs[i], ys[i], reserved)
+                self.emigrants.append((creature, xs[i], ys[i]))
+
+        xsNew = np.array([creature.x for creature in self.creatureList], dtype=int)
+        ysNew = np.array([creature.y for creature in self.creatureList], dtype=int)
+
+        return (xsNew != xs) | (ysNew != ys)
+
+    # Global state of a creature as it is sent to another strip
+    def pack(self, creature):
+
+        return (creature.x + self.offset, creature.y, creature.energy, creature.gen,
+                self.networkStore.genomes[creature.slot].copy(), self.networkStore.memory[creature.slot].copy(),
+                creature.destination + [self.offset, 0], creature.hasDestination)
+
+    def unpack(self, state):
+
+        x, y, energy, gen, genome, memory, destination, hasDestination = state
+
+        # Only the first network of a strip sets up the layout of its store, later genomes are copied into a slot
+        if self.networkStore.genomes is None:
+            slot = self.networkStore.add(self.createNetwork(genome))
+        else:
+            slot = self.networkStore.reserve()
+            self.networkStore.genomes[slot] = genome
+
+        self.networkStore.memory[slot] = memory
+
+        creature = Creature(energy, x - self.offset, y, gen, self.idCounter, slot)
+        creature.destination = destination - [self.offset, 0]
+        creature.hasDestination = hasDestination
+
+        self.placeCreature(creature)
+        return creature
+
+    # First part of a step, returns the states of the creatures that walked into the previous and the next strip
+    def walkPhase(self):
+
+        self.openHalo()
+        moved = self.creatureWalk()
+        self.movedIds = {creature.id for creature, hasMoved in zip(self.creatureList, moved) if hasMoved}
+
+        toPrevious = [self.pack(creature) for creature, _, _ in self.emigrants if creature.x < self.xMin]
+        toNext = [self.pack(creature) for creature, _, _ in self.emigrants if creature.x >= self.xMax]
+
+        return toPrevious, toNext
+
+    # Places the creatures handed over by the neighbouring strips, a creature whose tile was taken during the walk
+    # of this strip is refused, returns the indices of the refused creatures in both lists
+    def receive(self, fromPrevious, fromNext):
+
+        self.immigrants = []
+        refused = ([], [])
+
+        for k, states in enumerate([fromPrevious, fromNext]):
+            for i, state in enumerate(states):
+
+                if self.occupancy.isFree(state[0] - self.offset, state[1]):
+                    self.immigrants.append(self.unpack(state))
+                else:
+                    refused[k].append(i)
+
+        return refused
+
+    # Removes the creatures that were accepted by their new strip and puts the refused ones back on their old tile
+    def settleEmigrants(self, refusedByPrevious, refusedByNext):
+
+        toPrevious = [emigrant for emigrant in self.emigrants if emigrant[0].x < self.xMin]
+        toNext = [emigrant for emigrant in self.emigrants if emigrant[0].x >= self.xMax]
+        refused = {toPrevious[i][0].id for i in refusedByPrevious} | {toNext[i][0].id for i in refusedByNext}
+
+        leaving = []
+        for creature, x, y in self.emigrants:
+
+            if creature.id in refused:
+                self.occupancy.clear(creature.x, creature.y)
+                self.occupancy.set(x, y, creature.slot)
+                creature.x, creature.y = x, y
+                self.movedIds.discard(creature.id)
+            else:
+                self.occupancy.set(x, y, -1)
+                creature.destroy(self, deferRemoval=True)
+                leaving.append(creature)
+
+        self.creatureList.removeAll(leaving)
+        self.emigrants = []
+
+    # Rest of the step after the handover, returns the sum and count of the samples of every log this step
+    # together with the number of creatures
+    def finishStep(self, refusedByPrevious, refusedByNext):
+
+        self.settleEmigrants(refusedByPrevious, refusedByNext)
+        self.closeHalo()
+
+        self.movedIds.update(creature.id for creature in self.immigrants)
+        moved = np.array([creature.id in self.movedIds for creature in self.creatureList], dtype=bool)
+
+        self.creatureContact(moved)
+        self.creatureFeeding()
+        self.creatureEnergyDrain()
+        self.creatureReplicate()
+        self.updatePoison()
+        self.spawnFood()
+
+        creaturesToDestroy = [creature for creature in self.creatureList if creature.energy <= 0 or creature.toBeDestroyed]
+        for creature in creaturesToDestroy:
+            creature.destroy(self, deferRemoval=True)
+        self.creatureList.removeAll(creaturesToDestroy)
+
+        logs = [self.energyEatenLog, self.posEnergyEatenLog, self.negEnergyEatenLog]
+        sums = [(log.currentSum, log.currentCount) for log in logs]
+        self.updateLog()
+
+        self.writeWorld()
+        self.t += 1
+
+        return sums, len(self.creatureList)
+
+
+# Runs one strip in a worker process, the coordinating process sends the commands of every step through conn
+def runStrip(conn, Lx, Ly, x0, x1, worldNames, seed, halo, settings):
+
+    world = SharedWorld(Lx, Ly, worldNames)
+
+    # A strip that fails to start sends its exception instead of ready, the coordinating process raises it
+    try:
+        sim = StripSimulation(Lx, Ly, x0, x1, world, seed, halo, settings)
+    except Exception as exc:
+        conn.send(exc)
+        world.close()
+        conn.close()
+        return
+
+    sim.runningHidden = True
+    conn.send("ready")
+
+    while True:
+
+        command, *args = conn.recv()
+
+        if command == "walk":
+            conn.send(sim.walkPhase())
+        elif command == "receive":
+            conn.send(sim.receive(*args))
+        elif command == "finish":
+            conn.send(sim.finishStep(*args))
+        elif command == "settings":
+            # The settings hold the size of the whole world, not of the strip
+            settings = sim.hiddenSettings(args[0])
+            settings.vars["Lx"] = Lx
+            conn.send(settings)
+        elif command == "close":
+            break
+
+    del sim
+    world.close()
+    conn.close()
+
+
+# A Lx by Ly world split into horizontal strips of rows along x, each simulated by its own worker process
+# The per tile state lives in shared memory, halo rows are read from it at the start of every step and creatures
+# that cross a strip boundary are handed over through this process. Each strip has its own random stream spawned
+# from seed, so runs with the same seed and number of strips are reproducible but differ from a single Simulation
+# Memory sharing between creatures does not reach across strip boundaries
+class DomainSimulation:
+
+    # settings replaces default settings of every strip like it does for Simulation
+    def __init__(self, Lx, Ly, strips, seed=None, halo=3, settings=None):
+
+        bounds = np.linspace(0, Lx, strips + 1).astype(int)
+        if np.min(np.diff(bounds)) < halo:
+            raise ValueError(f"Strips of a {Lx} wide world are narrower than the halo of {halo} rows, use fewer strips")
+
+        # A 1 by 1 simulation has the smell range the strips get, so settings are checked before any process starts
+        smellRange = Simulation(1, 1, settings=settings).creatureSmellRange
+        if smellRange > halo:
+            raise ValueError(f"Creatures smell {smellRange} tiles but the halo is only {halo} rows")
+
+        self.Lx, self.Ly = Lx, Ly
+        self.t = 0
+        self.creatureCount = 0
+
+        self.energyEatenLog = Log()
+        self.posEnergyEatenLog = Log()
+        self.negEnergyEatenLog = Log()
+
+        self.world = SharedWorld(Lx, Ly)
+
+        seeds = np.random.SeedSequence(seed).spawn(strips)
+        self.conns = []
+        self.workers = []
+
+        # If a strip fails to start the strips that did start are stopped and the shared world is released
+        try:
+            for k in range(strips):
+
+                conn, workerConn = multiprocessing.Pipe()
+                worker = multiprocessing.Process(target=runStrip, args=(workerConn, Lx, Ly, bounds[k], bounds[k + 1], self.world.names(), seeds[k], halo, settings))
+                worker.start()
+
+                self.conns.append(conn)
+                self.workers.append(worker)
+
+            # No strip reads the halo before every strip has written its rows
+            for conn in self.conns:
+                message = conn.recv()
+                if isinstance(message, Exception):
+                    raise message
+
+        except BaseException:
+            self.close()
+            raise
+
+    def broadcast(self, messages):
+
+        for conn, message in zip(self.conns, messages):
+            conn.send(message)
+
+        return [conn.recv() for conn in self.conns]
+
+    def step(self):
+
+        n = len(self.conns)
+
+        emigrants = self.broadcast([("walk",)] * n)
+
+        refused = self.broadcast([("receive", emigrants[k - 1][1] if k > 0 else [], emigrants[k + 1][0] if k < n - 1 else [])
+                                  for k in range(n)])
+
+        finished = self.broadcast([("finish", refused[k - 1][1] if k > 0 else [], refused[k + 1][0] if k < n - 1 else [])
+                                   for k in range(n)])
+
+        # The strip logs are merged from their sums and counts, so the averages are over the whole world
+        logs = [self.energyEatenLog, self.posEnergyEatenLog, self.negEnergyEatenLog]
+        for sums, _ in finished:
+            for log, (total, count) in zip(logs, sums):
+                log.currentSum += total
+                log.currentCount += count
+
+        for log in logs:
+            log.finish()
+
+        self.creatureCount = sum(count for _, count in finished)
+        self.t += 1
+
+    def runHidden(self, steps):
+
+        settings = self.broadcast([("settings", steps)] * len(self.conns))[0]
+
+        for _ in range(steps):
+
+            if self.t % 300 == 0:
+                print(f"Simulation progress: {self.t} / {steps}, {self.creatureCount} creatures")
+
+            self.step()
+
+        return settings, Results(self)
+
+    def close(self):
+
+        for conn in self.conns:
+            try:
+                conn.send(("close",))
+            except OSError:
+                pass  # The worker has already stopped
+
+        for worker in self.workers:
+            worker.join()
+
+        self.world.close()
+        self.world.unlink()
+
+
+def runDomainHidden(Lx, Ly, strips, steps, seed=None, settings=None):
+
+    sim = DomainSimulation(Lx, Ly, strips, seed, settings=settings)
+
+    try:
+        return sim.runHidden(steps)
+    finally:
+        sim.close()
+
+
+if __name__ == "__main__":
+
+    runDomainHidden(600, 600, multiprocessing.cpu_count(), 1000, 0)
@@ -2,73 +2,83 @@
 #-----Imports-----#
 import numpy as np
 
-linear = lambda x: x
-relu = lambda x: x * (x > 0)
+# Activation kinds, applied in place by NetworkStore
+linear = "linear"
+relu = "relu"
 
 
-def mutateArray(array, std, p):
-    selected = np.random.random(array.shape) < p
-    array[selected] += np.random.normal(0, std, np.sum(selected))
+# Flat indices of the elements that mutate in an array with the given number of elements, each is picked with chance p
+# Only the picked elements are drawn: their number is binomial and their distinct positions are sampled directly
+def sampleMutations(size, p, rng):
+
+    count = rng.binomial(size, p)
+    selected = np.unique(rng.integers(size, size=count))
+
+    while len(selected) < count:
+        selected = np.unique(np.concatenate([selected, rng.integers(size, size=count - len(selected))]))
+
+    return selected
+
+def mutateArray(array, std, p, rng):
+    selected = sampleMutations(array.size, p, rng)
+    array.flat[selected] += rng.normal(0, std, len(selected))
+
+# Number of weights and biases of a chain of layers, sizes are listed from the output layer to the input layer
+def parameterCount(sizes):
+    return sum(sizes[i] * (sizes[i+1] + 1) for i in range(len(sizes) - 1))
+
 
 class Layer:
 
-    def __init__(self, size, activation, nextLayer = None):
+    # parameters is a flat array holding the weights and then the biases towards nextLayer, the layer keeps views into it
+    def __init__(self, size, activation, nextLayer = None, parameters = None, offset = 0):
 
         self.size = size
         self.activation = activation
         self.nextLayer = nextLayer
+        self.offset = offset  # Position of the parameters of this layer in the genome of its network
 
         if nextLayer == None:
             pass
         else:
-            self.M = np.random.normal(0, 0.1, size=(self.nextLayer.size, size))
-            self.bias = np.random.normal(0, 0.1, size=nextLayer.size)
-
-
-    def mutate(self, std, p):
-
-        mutateArray(self.M, std, p)
-        mutateArray(self.bias, std, p)
-
-    def run(self, input):
-
-        if self.nextLayer == None:
-            return input
-
-        output = self.nextLayer.activation(np.dot(self.M, input) + self.bias)
-
-        return self.nextLayer.run(output)
-
-    def copy(self, std, p):
-
-        child = Layer(self.size, self.activation, self.nextLayer)
-
-        if self.nextLayer != None:
-            child.M = np.copy(self.M)
-            child.bias = np.copy(self.bias)
-
-            child.mutate(std, p)
-
-        return child
-
-
+            n = self.nextLayer.size * size
+            self.M = parameters[:n].reshape(self.nextLayer.size, size)
+            self.bias = parameters[n:]
 
 
+# Genome and layer layout of one network, NetworkStore keeps it in a slot and evaluates and copies it from there
 class Network:
 
-    def __init__(self, memorySize, memoryUpdateRate, mutateStd, mutateP, memoryHiddenSizes, decisionHiddenSizes):
+    # rng is the random generator of the simulation, it draws the initial genome
+    def __init__(self, memorySize, memoryHiddenSizes, decisionHiddenSizes, rng, genome=None):
 
         self.memorySize = memorySize
-        self.memoryUpdateRate = memoryUpdateRate
-        self.mutateStd, self.mutateP = mutateStd, mutateP
         self.memoryHiddenSizes = memoryHiddenSizes
         self.decisionHiddenSizes = decisionHiddenSizes
 
-        self.memory = np.zeros(memorySize)
+        # All weights and biases of both networks live in one contiguous genome, the layers hold views into it
+        # Layers are laid out from the output layer backwards, memory network first
+        self.memoryLayerSizes = [memorySize] + list(memoryHiddenSizes) + [4]
+        self.decisionLayerSizes = [1] + list(decisionHiddenSizes) + [memorySize + 3]
+        genomeSize = parameterCount(self.memoryLayerSizes) + parameterCount(self.decisionLayerSizes)
+
+        if genome is None:
+            genome = rng.normal(0, 0.1, size=genomeSize).astype(np.float32)
+
+        self.genome = genome
+        self.genomeOffset = 0
 
         self.memoryNetwork = self.setupMemoryNetwork()
         self.decisionNetwork = self.setupDecisionNetwork()
 
+    # Creates a layer feeding into nextLayer whose parameters are the next unused part of the genome
+    def createLayer(self, size, activation, nextLayer):
+
+        offset = self.genomeOffset
+        self.genomeOffset += nextLayer.size * (size + 1)
+
+        return Layer(size, activation, nextLayer, self.genome[offset:self.genomeOffset], offset)
+
     #Network used for updating memory
     def setupMemoryNetwork(self):
 
@@ -78,10 +88,10 @@ class Network:
         memoryNetwork = [outLayer]
 
         for size in self.memoryHiddenSizes:
-            h = Layer(size, relu, memoryNetwork[-1])
+            h = self.createLayer(size, relu, memoryNetwork[-1])
             memoryNetwork.append(h)
 
-        inputLayer = Layer(4, relu, memoryNetwork[-1])
+        inputLayer = self.createLayer(4, relu, memoryNetwork[-1])
         memoryNetwork.append(inputLayer)
 
         return memoryNetwork
@@ -92,49 +102,154 @@ class Network:
 
         decisionNetwork = [outLayer]
 
-        for size in self.memoryHiddenSizes:
-            h = Layer(size, relu, decisionNetwork[-1])
+        for size in self.decisionHiddenSizes:
+            h = self.createLayer(size, relu, decisionNetwork[-1])
             decisionNetwork.append(h)
 
-        inputLayer = Layer(self.memorySize + 3, relu, decisionNetwork[-1])
+        inputLayer = self.createLayer(self.memorySize + 3, relu, decisionNetwork[-1])
         decisionNetwork.append(inputLayer)
 
         return decisionNetwork
 
 
-    def updateMemory(self, c: np.array, E: float):
 
-        input = np.zeros(4)
-        input[0:3] = c
-        input[3] = E
+# Layers along the chain starting at inputLayer in the order they are evaluated, with the genome offset of their parameters
+def layerChain(inputLayer):
+
+    chain = []
+    layer = inputLayer
+    while layer.nextLayer != None:
+        chain.append((layer.offset, layer.nextLayer.size, layer.size, layer.nextLayer.activation))
+        layer = layer.nextLayer
+
+    return chain
+
+
+# The genomes and memories of a whole population stacked into arrays, one slot per network
+# Lets the simulation evaluate the networks of many creatures with one batched matmul per layer
+class NetworkStore:
+
+    def __init__(self, capacity, memorySize, memoryUpdateRate, rng):
+
+        self.capacity = capacity
+        self.rng = rng
+        self.memoryUpdateRate = memoryUpdateRate
+        self.memory = np.zeros((capacity, memorySize))
+
+        # Genome arrays are allocated when the first network is stored, they take the layout of its genome
+        self.genomes = None
+        self.memoryChain = None
+        self.decisionChain = None
+
+        # Work arrays of decide, updateMemory and run by name, reused between calls
+        self.buffers = {}
+
+        self.freeSlots = list(range(capacity-1, -1, -1))
+
+    # The first k rows of the work array of the given name, whose rows have the given shape and type
+    # Work arrays grow to twice the rows asked for, so they are rarely reallocated as the population changes
+    def buffer(self, name, k, shape, dtype=float):
+
+        buffer = self.buffers.get(name)
+        if buffer is None or len(buffer) < k:
+            buffer = np.empty((min(2 * k, self.capacity),) + shape, dtype=dtype)
+            self.buffers[name] = buffer
+
+        return buffer[:k]
+
+    # Stores the network in a free slot with an empty memory and returns that slot
+    def add(self, network):
+
+        if self.genomes is None:
+            self.genomes = np.zeros((self.capacity, len(network.genome)), dtype=network.genome.dtype)
+            self.memoryChain = layerChain(network.memoryNetwork[-1])
+            self.decisionChain = layerChain(network.decisionNetwork[-1])
+
+        slot = self.reserve()
+        self.genomes[slot] = network.genome
+
+        return slot
+
+    # Takes a free slot whose genome is filled in later, for example by copy
+    def reserve(self):
+
+        slot = self.freeSlots.pop()
+        self.memory[slot] = 0
+
+        return slot
+
+    # Copies the genomes of the parent slots into the child slots and mutates all children in one pass
+    def copy(self, parentSlots, childSlots, std, p):
+
+        genomes = self.genomes[parentSlots]
+        mutateArray(genomes, std, p, self.rng)
+        self.genomes[childSlots] = genomes
+
+    def remove(self, slot):
+        self.freeSlots.append(slot)
+
+    # Runs the chain for the networks in the given slots, the result is a view into a work array and is overwritten
+    # by the next run of the same chain
+    # The slots are always valid, mode='clip' lets np.take write straight into the work array, the default mode copies
+    # through a temporary. The weights are cast to the type of the input, np.matmul would allocate a cast copy itself
+    def run(self, chain, slots, input):
+
+        k = len(slots)
+        genomes = self.buffer("genomes", k, self.genomes.shape[1:], self.genomes.dtype)
+        np.take(self.genomes, slots, axis=0, out=genomes, mode='clip')
+
+        # Layer offsets are unique across both chains, so they name the work arrays of a layer
+        for offset, outSize, inSize, activation in chain:
+            n = outSize * inSize
+            Ms = self.buffer(("weights", offset), k, (outSize, inSize), input.dtype)
+            biases = self.buffer(("biases", offset), k, (outSize,), input.dtype)
+            output = self.buffer(("output", offset), k, (outSize, 1), input.dtype)
 
-        newMemory = self.memoryNetwork[-1].run(input)
-        self.memory = self.memoryUpdateRate * newMemory + (1 - self.memoryUpdateRate) * self.memory
+            Ms[:] = genomes[:, offset:offset+n].reshape(k, outSize, inSize)
+            biases[:] = genomes[:, offset+n:offset+n+outSize]
 
+            np.matmul(Ms, input[:, :, None], out=output)
 
-    def decide(self, c: np.array):
+            input = output[:, :, 0]
+            input += biases
+            if activation == relu:
+                np.maximum(input, 0, out=input)
 
-        input = np.zeros(self.memorySize + 3)
-        input[0:self.memorySize] = self.memory
-        input[self.memorySize:self.memorySize+3] = c
+        return input
 
-        output = self.decisionNetwork[-1].run(input)
+    # Whether the networks in the given slots eat, their decision networks see their memory and c, one food color per slot
+    def decide(self, slots, c):
 
-        return output[0] >= 0
+        k, m = len(slots), self.memory.shape[1]
 
-    def copy(self):
+        # np.take only writes into contiguous arrays without a temporary, so the memories are gathered first
+        memory = self.buffer("memory", k, (m,))
+        np.take(self.memory, slots, axis=0, out=memory, mode='clip')
 
-        child = Network(self.memorySize, self.memoryUpdateRate, self.mutateStd, self.mutateP, self.memoryHiddenSizes, self.decisionHiddenSizes)
+        input = self.buffer("decisionInput", k, (m + 3,))
+        input[:, :m] = memory
+        input[:, m:] = c
 
-        child.memoryNetwork = [layer.copy(self.mutateStd, self.mutateP) for layer in self.memoryNetwork]
-        child.decisionNetwork = [layer.copy(self.mutateStd, self.mutateP) for layer in self.decisionNetwork]
+        output = self.run(self.decisionChain, slots, input)
 
-        return child
+        return output[:, 0] >= 0
 
+    # Moves the memory of the given slots towards the output of their memory networks, c and E hold one food color and energy per slot
+    def updateMemory(self, slots, c, E):
 
+        k, m = len(slots), self.memory.shape[1]
 
+        input = self.buffer("memoryInput", k, (4,))
+        input[:, :3] = c
+        input[:, 3] = E
 
+        newMemory = self.run(self.memoryChain, slots, input)
 
-# network = Network(5, 0.1, 1, 0.1)
-# network.updateMemory(np.array([1, 0, 1]), 3)
+        # memoryUpdateRate * newMemory + (1 - memoryUpdateRate) * memory, computed in place in the work arrays
+        memory = self.buffer("memory", k, (m,))
+        np.take(self.memory, slots, axis=0, out=memory, mode='clip')
+        memory *= 1 - self.memoryUpdateRate
+        newMemory *= self.memoryUpdateRate
+        memory += newMemory
 
+        self.memory[slots] = memory
@@ -1,6 +1,11 @@
 
 #-----Imports-----#
 import concurrent.futures
+import time
+import numpy as np
+
+#-----InternalImports-----#
+from Saver import prepareFolder, saveRunAt, isRunSaved
 
 
 def runAsync(func, nRuns):
@@ -22,4 +27,63 @@ def runAsync(func, nRuns):
             except Exception as exc:
                 print(f"Simulation generated an exception: {exc}")
 
-    return settingsList, resultsList
\ No newline at end of file
+    return settingsList, resultsList
+
+
+# Runs func(index, seed) for runs 0..nRuns-1 over a process pool, func returns the settings and results of its run
+# Run i gets child i of the SeedSequence of seed, so runs never share a random stream and a repeated sweep gets the same ones
+# Run i is saved as Run{i+1} in the results folder at path as soon as it finishes, settings are the Settings every run returns
+def runSweep(func, nRuns, path, settings, seed=0, workers=None):
+
+    seeds = np.random.SeedSequence(seed).spawn(nRuns)
+    runJobs(func, [(path, i + 1, (i, seeds[i])) for i in range(nRuns)], {path: settings}, workers)
+
+
+# Runs func(setting, seed) for every setting in settingsList and every run 0..nRuns-1 over one process pool
+# The runs of settingsList[k] are saved in the results folder paths[k] and return the Settings folderSettings[k],
+# run i of every setting gets the same seed, so the settings are compared on the same random streams
+def runGridSweep(func, settingsList, paths, folderSettings, nRuns, seed=0, workers=None):
+
+    seeds = np.random.SeedSequence(seed).spawn(nRuns)
+    jobs = [(path, i + 1, (setting, seeds[i])) for setting, path in zip(settingsList, paths) for i in range(nRuns)]
+    runJobs(func, jobs, dict(zip(paths, folderSettings)), workers)
+
+
+# Runs func(*args) for every job (path, run, args) over a process pool and saves it as Run{run} at path when it finishes
+# folderSettings maps every path to the Settings of its runs, all folders are checked against them before any job starts
+# Runs that are already saved are skipped, so an interrupted sweep continues where it stopped
+def runJobs(func, jobs, folderSettings, workers=None):
+
+    for path, settings in folderSettings.items():
+        prepareFolder(path, settings)
+
+    pending = [(path, run, args) for path, run, args in jobs if not isRunSaved(path, run)]
+
+    if len(pending) < len(jobs):
+        print(f"{len(jobs) - len(pending)} of {len(jobs)} runs are already saved")
+
+    startTime = time.time()
+    finished = 0
+
+    with concurrent.futures.ProcessPoolExecutor(workers) as executor:
+
+        futures = {executor.submit(func, *args): (path, run) for path, run, args in pending}
+
+        for future in concurrent.futures.as_completed(futures):
+            path, run = futures[future]
+
+            try:
+                settings, results = future.result()
+                saveRunAt(path, run, settings, results)
+
+            except Exception as exc:
+                print(f"Run {run} of {path} generated an exception: {exc}")
+                continue
+
+            finished += 1
+            dt = time.time() - startTime
+            eta = dt / finished * (len(pending) - finished)
+
+            print(f"Run {run} of {path} saved, {finished}/{len(pending)} done, "
+                  f"{round(3600 * finished / dt, 1)} runs/h, ETA {round(eta)}s")
+
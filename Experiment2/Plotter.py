@@ -2,77 +2,28 @@
 #-----Import-----#
 import numpy as np
 import matplotlib.pyplot as plt
-import pickle
-import os
 
-from Saver import Log
+from Saver import readResultSets
+from Analysis import slidingWindow, runStatistics
 
 
-def pastAverage(array, window):
-    n = len(array)
-
-    if window > n:
-        return np.average(array)
-    else:
-        return np.average(array[n - window:n])
-
-def slidingWindow(array, window):
-    return np.array([pastAverage(array[0:i], window) for i in range(len(array))])
-
-
-def readResults():
-
-    settingsArray = []
-    resultsArray = []
-
-    i = 1
-    while True:
-
-        folderPath = "SimResults" + str(i)
-        i += 1
-
-        if not os.path.isdir(folderPath):
-            return settingsArray, resultsArray
-
-        with open(folderPath + "/pickledSettings.obj", 'rb') as settingsFile:
-            settings = pickle.load(settingsFile)
-
-        settingsArray.append(settings)
-
-        resultsArray.append([])
-
-        j = 1
-        while True:
-            resultsPath = folderPath + "/Run" + str(j)
-            j += 1
-
-            if not os.path.isdir(resultsPath):
-                break
-
-            with open(resultsPath + "/PickledResults.obj", 'rb') as resultsFile:
-                results = pickle.load(resultsFile)
-
-            resultsArray[-1].append(results)
-
-
-settingsArray, resultsArray = readResults()
+resultSets = readResultSets()
 
 
 def plotEnergyEaten(index, window):
 
-    results = resultsArray[index]
-    settings = settingsArray[index]
+    resultSet = resultSets[index]
 
-    Tfood = np.pi * (2/3) / settings.vars["poisonChangeRate"]
+    Tfood = np.pi * (2/3) / resultSet.settings["poisonChangeRate"]
 
 
-    posEnergyArray = np.array([result.vars["posEnergyEatenLog"].log for result in results])
-    negEnergyArray = np.array([result.vars["negEnergyEatenLog"].log for result in results])
+    avgPosEnergy, stdPosEnergy = runStatistics(resultSet, "posEnergyEatenLog")
+    avgNegEnergy, stdNegEnergy = runStatistics(resultSet, "negEnergyEatenLog")
 
-    avgPosEnergy = slidingWindow(np.average(posEnergyArray, axis=0), window)
-    stdPosEnergy = slidingWindow(np.std(posEnergyArray, axis=0), window)
-    avgNegEnergy = slidingWindow(np.average(negEnergyArray, axis=0), window)
-    stdNegEnergy = slidingWindow(np.std(negEnergyArray, axis=0), window)
+    avgPosEnergy = slidingWindow(avgPosEnergy, window)
+    stdPosEnergy = slidingWindow(stdPosEnergy, window)
+    avgNegEnergy = slidingWindow(avgNegEnergy, window)
+    stdNegEnergy = slidingWindow(stdNegEnergy, window)
 
     n = len(avgPosEnergy)
 
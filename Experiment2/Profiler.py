@@ -0,0 +1,99 @@
+#-----Imports-----#
+import time
+import numpy as np
+
+
+# Times the phases of every simulation step and keeps a histogram of the durations of each phase
+# Call start at the beginning of a step, lap after every phase and finish at the end of the step
+# While disabled every call returns right away, so the profiler can stay in the step loop
+class PhaseProfiler:
+
+    def __init__(self, phases, enabled=False, window=300, minTime=1e-6, decades=7, binsPerDecade=10):
+
+        self.phases = list(phases)
+        self.phaseIndex = {phase: i for i, phase in enumerate(self.phases)}
+        self.enabled = enabled
+
+        # Logarithmic bins from minTime up to minTime * 10^decades, durations outside fall in the first or last bin
+        self.minTime = minTime
+        self.binsPerDecade = binsPerDecade
+        self.binEdges = minTime * 10 ** (np.arange(decades * binsPerDecade + 1) / binsPerDecade)
+        self.histograms = np.zeros((len(self.phases), decades * binsPerDecade), dtype=np.int64)
+
+        self.totals = np.zeros(len(self.phases))
+        self.steps = 0
+
+        # Phase times of the last window steps for the sidebar
+        self.recent = np.zeros((window, len(self.phases)))
+
+        self.stepTimes = np.zeros(len(self.phases))
+        self.lastTime = 0
+
+    def start(self):
+
+        if not self.enabled:
+            return
+
+        self.stepTimes[:] = 0
+        self.lastTime = time.perf_counter()
+
+    # Adds the time since the previous start or lap to phase
+    def lap(self, phase):
+
+        if not self.enabled:
+            return
+
+        now = time.perf_counter()
+        self.stepTimes[self.phaseIndex[phase]] += now - self.lastTime
+        self.lastTime = now
+
+    def finish(self):
+
+        if not self.enabled:
+            return
+
+        with np.errstate(divide='ignore'):
+            bins = np.floor(self.binsPerDecade * np.log10(self.stepTimes / self.minTime))
+        bins = np.clip(bins, 0, self.histograms.shape[1] - 1).astype(int)
+
+        self.histograms[np.arange(len(self.phases)), bins] += 1
+        self.totals += self.stepTimes
+        self.recent[self.steps % len(self.recent)] = self.stepTimes
+        self.steps += 1
+
+    # Average time of every phase over the last window profiled steps
+    def recentAverages(self):
+
+        n = min(self.steps, len(self.recent))
+        if n == 0:
+            return np.zeros(len(self.phases))
+
+        return np.mean(self.recent[:n], axis=0)
+
+    # Median of every phase estimated from its histogram, from the geometric centre of the median bin
+    def medians(self):
+
+        centres = np.sqrt(self.binEdges[:-1] * self.binEdges[1:])
+        cumulative = np.cumsum(self.histograms, axis=1)
+        medianBins = np.argmax(cumulative >= 0.5 * np.maximum(cumulative[:, -1:], 1), axis=1)
+
+        return centres[medianBins]
+
+    def summary(self):
+
+        total = max(np.sum(self.totals), 1e-12)
+        medians = self.medians()
+
+        text = f"Profiled steps: {self.steps}, total {round(total, 3)}s\n"
+        for i, phase in enumerate(self.phases):
+            mean = self.totals[i] / max(self.steps, 1)
+            text += (f"{phase}: mean {round(1000 * mean, 4)}ms, median {round(1000 * medians[i], 4)}ms, "
+                     f"{round(100 * self.totals[i] / total, 1)}%\n")
+
+        return text
+
+    # Writes the histograms and totals to a .npz file, the histogram of phases[i] is histograms[i] over binEdges
+    def save(self, path):
+
+        np.savez(path, phases=np.array(self.phases), binEdges=self.binEdges, histograms=self.histograms,
+                 totals=self.totals, steps=self.steps)
@@ -1,75 +1,132 @@
 
 #-----Imports-----#
 import os
+import re
+import json
 import pickle
+import shutil
 import numpy as np
 
+# Per tick averages of a quantity, samples of the current tick are added and finish closes the tick
+# Only a running sum and count are kept for the current tick, finished averages go into a growing float64 array
+# together with their prefix sums so that pastAverage takes constant time
 class Log:
 
-    def __init__(self):
-        self.current = []
-        self.log = []
+    def __init__(self, log=()):
+
+        self.currentSum = 0
+        self.currentCount = 0
+
+        log = np.asarray(log, dtype=float)
+        self.n = len(log)
+        self.values = np.zeros(max(1024, 2 * self.n))
+        self.values[:self.n] = log
+        self.prefixSums = np.zeros(len(self.values) + 1)  # prefixSums[i] is the sum of the first i finished values
+        np.cumsum(log, out=self.prefixSums[1:self.n+1])
+
+    # Finished per tick averages
+    @property
+    def log(self):
+        return self.values[:self.n]
 
     def add(self, x):
-        self.current.append(x)
+        self.currentSum += x
+        self.currentCount += 1
+
+    def addAll(self, xs):
+        self.currentSum += np.sum(xs)
+        self.currentCount += len(xs)
 
     def finish(self):
 
-        if len(self.current) > 0:
-            xAvg = np.average(self.current)
+        if self.currentCount > 0:
+            xAvg = self.currentSum / self.currentCount
         else:
             xAvg = 0
 
-        self.log.append(xAvg)
-        self.current = []
+        if self.n == len(self.values):
+            self.values = np.concatenate([self.values, np.zeros(len(self.values))])
+            self.prefixSums = np.concatenate([self.prefixSums, np.zeros(len(self.values) - len(self.prefixSums) + 1)])
 
+        self.values[self.n] = xAvg
+        self.prefixSums[self.n + 1] = self.prefixSums[self.n] + xAvg
+        self.n += 1
+
+        self.currentSum = 0
+        self.currentCount = 0
+
+    # Average of the last window finished values, or of all of them if there are fewer
     def pastAverage(self, window):
 
-        n = len(self.log)
+        window = min(window, self.n)
+
+        if window == 0:
+            return np.nan
 
-        if window > n:
-            return np.average(self.log)
+        return (self.prefixSums[self.n] - self.prefixSums[self.n - window]) / window
+
+    # Only the finished values are pickled, results pickled with the old list based Log can still be loaded
+    def __getstate__(self):
+        return {"log": np.array(self.log), "currentSum": self.currentSum, "currentCount": self.currentCount}
+
+    def __setstate__(self, state):
+
+        self.__init__(state["log"])
+
+        if "current" in state:
+            self.addAll(state["current"])
         else:
-            return np.average(self.log[n-window:n])
+            self.currentSum, self.currentCount = state["currentSum"], state["currentCount"]
 
 
-# Saves results of simulation to a folder
-# If a simulation was already run and saved with same settings as current
-# -> save sim in same folder
-# Otherwise create new folder
-def save(settings, results):
+# Results folder for simulations with the given settings
+# If a simulation was already run and saved with same settings as current -> that folder
+# Otherwise the first folder name that is not taken yet
+def findResultsFolder(settings, folderName="SimResults"):
 
-    folderName = "SimResults"
     i = 1
 
+    # Round trip through json so the comparison sees the settings as they are stored
+    settingsVars = json.loads(json.dumps(settings.vars))
+
     while True:
 
         path = folderName + str(i)
 
-        # If folder doesn't exist we have looped through all folders and create a new one
+        # If folder doesn't exist we have looped through all folders and a new one is used
         if not os.path.isdir(path):
-            return saveNewDir(path, settings, results)
-
-        # Load settings of currently examined folder
-        with open(path + "/pickledSettings.obj", 'rb') as settingsFile:
-            folderSettings = pickle.load(settingsFile)
+            return path
 
-        # If settings are same as our settings save results there
-        if folderSettings == settings:
-            return saveOldDir(path, results)
+        # If settings are same as our settings use that folder
+        if readSettings(path) == settingsVars:
+            return path
 
         #Else check the next folder
         else:
             i += 1
 
 
+# Saves results of simulation to a folder
+# If a simulation was already run and saved with same settings as current
+# -> save sim in same folder
+# Otherwise create new folder
+def save(settings, results):
+
+    path = findResultsFolder(settings)
+
+    if not os.path.isdir(path):
+        return saveNewDir(path, settings, results)
+
+    return saveOldDir(path, results)
+
+
 # Creates a new folder for results with given simulation settings and save results there
 def saveNewDir(path, settings, results):
 
     os.makedirs(path)
 
-    with open(path + "/pickledSettings.obj", 'wb') as settingsFile:
-        pickle.dump(settings, settingsFile)
+    with open(path + "/Settings.json", 'w') as settingsFile:
+        json.dump(settings.vars, settingsFile, indent=4)
 
     saveRun(path+"/Run1", results)
 
@@ -88,14 +145,101 @@ def saveOldDir(path, results):
             return saveRun(runPath, results)
 
 
+# Makes sure the results folder at path is meant for results of the given settings, a new folder gets their Settings.json
+# Raises ValueError if the folder already holds results of simulations with different settings
+def prepareFolder(path, settings):
+
+    os.makedirs(path, exist_ok=True)
+
+    settingsVars = json.loads(json.dumps(settings.vars))
+    hasSettings = os.path.isfile(path + "/Settings.json") or os.path.isfile(path + "/pickledSettings.obj")
+
+    if not hasSettings:
+        with open(path + "/Settings.json", 'w') as settingsFile:
+            json.dump(settings.vars, settingsFile, indent=4)
+
+    elif readSettings(path) != settingsVars:
+        raise ValueError(f"{path} holds results of simulations with different settings")
+
+
+# Saves the results as run number run of the results folder at path, used by sweeps that number their runs themselves
+# The run is written to a temporary folder first so that an interrupted save never looks like a finished run
+def saveRunAt(path, run, settings, results):
+
+    prepareFolder(path, settings)
+
+    partialPath = f"{path}/Run{run}.partial"
+    shutil.rmtree(partialPath, ignore_errors=True)
+    saveRun(partialPath, results)
+    os.replace(partialPath, f"{path}/Run{run}")
+
+
+def isRunSaved(path, run):
+    return os.path.isdir(f"{path}/Run{run}")
+
+
+# Every log is stored as its own float32 column so it can be memory-mapped without reading the rest of the run
 def saveRun(path, results):
 
     os.makedirs(path)
 
-    with open(f"{path}/PickledResults.obj", "wb") as pickledResultsFile:
-        pickle.dump(results, pickledResultsFile)
+    for name, log in results.vars.items():
+        np.save(f"{path}/{name}.npy", np.asarray(log.log, dtype=np.float32))
+
+
+# Settings vars of a results folder, folders written before the json manifest only have the pickled Settings
+def readSettings(path):
+
+    if os.path.isfile(path + "/Settings.json"):
+        with open(path + "/Settings.json", 'r') as settingsFile:
+            return json.load(settingsFile)
+
+    with open(path + "/pickledSettings.obj", 'rb') as settingsFile:
+        return json.loads(json.dumps(pickle.load(settingsFile).vars))
+
+
+# The runs saved in one results folder, log columns are only read from disk when they are asked for
+class ResultSet:
+
+    def __init__(self, path):
+
+        self.path = path
+        self.settings = readSettings(path)
+
+        # Sweeps save their runs out of order, so a missing run number does not end the list
+        runs = [int(name[3:]) for name in os.listdir(path) if re.fullmatch(r"Run\d+", name) and os.path.isdir(f"{path}/{name}")]
+        self.runPaths = [f"{path}/Run{run}" for run in sorted(runs)]
+
+    def __len__(self):
+        return len(self.runPaths)
+
+    # The log of one run as a read-only memory-mapped array
+    def column(self, run, name):
+
+        runPath = self.runPaths[run]
+
+        if os.path.isfile(f"{runPath}/{name}.npy"):
+            return np.load(f"{runPath}/{name}.npy", mmap_mode='r')
+
+        with open(f"{runPath}/PickledResults.obj", 'rb') as resultsFile:
+            return pickle.load(resultsFile).vars[name].log
+
+    # The log of every run, one run at a time
+    def columns(self, name):
+
+        for run in range(len(self)):
+            yield self.column(run, name)
 
+    # The log of every run stacked into a (runs, steps) array
+    def stack(self, name):
+        return np.stack(list(self.columns(name)))
 
 
+# All results folders in order, SimResults1, SimResults2, ...
+def readResultSets(folderName="SimResults"):
 
+    resultSets = []
+    while os.path.isdir(folderName + str(len(resultSets) + 1)):
+        resultSets.append(ResultSet(folderName + str(len(resultSets) + 1)))
 
+    return resultSets
@@ -3,26 +3,17 @@
 
 class Settings:
 
+    # Settings of a simulation that can be given to its constructor, the world size Lx, Ly and totalSteps are stored too
+    names = ["creatureSpawnChance", "creatureInitEnergy", "creatureOffspringEnergy", "creatureDrainEnergy",
+             "creatureSmellRange", "foodSpawnChance", "foodInitEnergy", "poisonChangeRate", "poisonStd",
+             "poisonOffset", "memorySize", "memoryUpdateRate", "mutateStd", "mutateP", "memoryShareChance",
+             "memoryHiddenSizes", "decisionHiddenSizes"]
+
     def __init__(self, sim):
 
-        self.vars = {"creatureSpawnChance": sim.creatureSpawnChance,
-                     "creatureInitEnergy": sim.creatureInitEnergy,
-                     "creatureOffspringEnergy": sim.creatureOffspringEnergy,
-                     "creatureDrainEnergy": sim.creatureDrainEnergy,
-                     "creatureSmellRange": sim.creatureSmellRange,
-                     "foodSpawnChance": sim.foodSpawnChance,
-                     "foodInitEnergy": sim.foodInitEnergy,
-                     "poisonChangeRate": sim.poisonChangeRate,
-                     "poisonStd": sim.poisonStd,
-                     "poisonOffset": sim.poisonOffset,
-                     "memorySize": sim.memorySize,
-                     "memoryUpdateRate": sim.memoryUpdateRate,
-                     "mutateStd": sim.mutateStd,
-                     "mutateP": sim.mutateP,
-                     "memoryShareChance": sim.memoryShareChance,
-                     "memoryHiddenSizes": sim.memoryHiddenSizes,
-                     "decisionHiddenSizes": sim.decisionHiddenSizes,
-                     "totalSteps": sim.totalSteps}
+        self.vars = {name: getattr(sim, name) for name in Settings.names}
+        self.vars["Lx"], self.vars["Ly"] = sim.Lx, sim.Ly
+        self.vars["totalSteps"] = sim.totalSteps
 
     def __eq__(self, other):
         if not isinstance(other, Settings):
@@ -1,20 +1,22 @@
 
 #-----Imports-----#
-import matplotlib.colors
 import numpy as np
-import pyglet
-from pyglet import shapes
 import time
 import math
 
 #-----InternalImports-----#
-from Networks import Network
-from Buttons import Slider
+from Networks import Network, NetworkStore
+from Buttons import Slider, ProfilerSlider
 from Creature import Creature
 from Settings import Settings, Results
-from Saver import save, Log
-from ChunkManager import ChunkManager
-from Parallelizer import runAsync
+from Saver import findResultsFolder, Log
+from SpatialHash import SpatialHash
+from Spawner import FreeCellSampler
+from Registry import CreatureRegistry
+from GridRenderer import GridRenderer
+from OccupancyGrid import OccupancyGrid
+from Parallelizer import runSweep
+from Profiler import PhaseProfiler
 
 
 #-----Constants-----#
@@ -26,32 +28,40 @@ black = [0, 0, 0]
 white = [222, 221, 215]
 creatureBlue = [255, 255, 255]
 
-# Randomly generates a 3d vector where elements sum to 1 and el > 0, el < 1
-def generateColor():
+# Randomly generates n 3d vectors where elements sum to 1 and el > 0, el < 1, as a (n, 3) array
+# Points (a, b) are drawn in a rectangle around the valid triangle and rejected in batches, about 42% are accepted
+def generateColors(n, rng):
 
     Cx = np.array([1/np.sqrt(2), 0, -1/np.sqrt(2)])
     Cy = np.array([1/np.sqrt(6), -np.sqrt(2/3), 1/np.sqrt(6)])
     C0 = np.array([1/3, 1/3, 1/3])
 
-    while True:
+    colors = np.zeros((0, 3))
+    while len(colors) < n:
 
-        a = np.random.uniform(-0.85,0.75)
-        b = np.random.uniform(-0.85, 0.45)
+        # Draw enough candidates to find the missing colors in one go most of the time
+        m = int(2.6 * (n - len(colors))) + 8
+        a = rng.uniform(-0.85, 0.75, m)
+        b = rng.uniform(-0.85, 0.45, m)
 
-        C = a * Cx + b * Cy + C0
+        C = a[:, None] * Cx + b[:, None] * Cy + C0
+        colors = np.concatenate([colors, C[np.all((C > 0) & (C < 1), axis=1)]])
 
-        if C[0] > 0 and C[0] < 1 and C[1] > 0 and C[1] < 1 and C[2] > 0 and C[2] < 1:
-            return C
+    return colors[:n]
 
 
 class Simulation:
 
-    def __init__(self, Lx, Ly):
+    # settings maps names of the settings below to values that replace their defaults, as listed in Settings
+    def __init__(self, Lx, Ly, seed=None, settings=None):
 
         self.Lx, self.Ly = Lx, Ly
 
-        self.creatureArray = np.empty((Lx,Ly), dtype=Creature)
-        self.creatureList = []
+        # All randomness of the run comes from this generator, seed can be an int or a SeedSequence
+        self.rng = np.random.default_rng(seed)
+
+        self.occupancy = OccupancyGrid(Lx, Ly)  # Network slot of the creature on every tile
+        self.creatureList = CreatureRegistry()
 
         self.hasFoodArray = np.full((Lx, Ly), False, dtype=bool)
         self.foodColorArray = np.zeros((Lx, Ly, 3), dtype=float)
@@ -83,10 +93,12 @@ class Simulation:
         self.posEnergyEatenLog = Log()
         self.negEnergyEatenLog = Log()
 
-        self.tWalkLog = Log()
+        # Phases of step in the order they run, timed by the profiler when it is switched on
+        self.profiler = PhaseProfiler(["walk", "contact", "feeding", "drain", "replicate", "poison", "spawn", "destroy", "logging"])
 
         #VisualSettings
         self.creatureSize = 8
+        self.renderer = None
         self.sidebarLength = 300
         self.poisonGraphHeight = 100
 
@@ -99,14 +111,22 @@ class Simulation:
         self.memoryHiddenSizes = [10]
         self.decisionHiddenSizes = [10]
 
-        self.foodChunkManager = ChunkManager(self.creatureSmellRange, self.creatureSmellRange, self.Lx, self.Ly)
+        for name, value in (settings or {}).items():
+            if name not in Settings.names:
+                raise ValueError(f"Unknown setting {name}")
+            setattr(self, name, value)
+
+        # There is at most one creature per tile
+        self.networkStore = NetworkStore(Lx * Ly, self.memorySize, self.memoryUpdateRate, self.rng)
+
+        self.foodChunkManager = SpatialHash(self.creatureSmellRange, self.creatureSmellRange, self.Lx, self.Ly)
+
+        self.createSamplers()
 
         self.idCounter = 0
 
         self.buttons = []
 
-        self.setButtons()
-
         self.spawnCreatures()
 
 
@@ -130,8 +150,18 @@ class Simulation:
         self.showGraphicsSlider = Slider(xMax + 0.75 * L - 0.5 * sWidth, yMax - 0.5 * backgroundHeight - 0.5 * sHeight, sWidth, sHeight,
                color, text2)
 
+        self.profilerSlider = ProfilerSlider(xMax + 0.25 * L - 0.5 * sWidth, yMax - 0.75 * L - 0.5 * sHeight, sWidth, sHeight,
+               color, "Profile phases")
+
         self.buttons.append(self.foodAppearanceSlider)
         self.buttons.append(self.showGraphicsSlider)
+        self.buttons.append(self.profilerSlider)
+
+    # Food and creatures can spawn on every tile of the grid
+    def createSamplers(self):
+
+        self.foodSampler = FreeCellSampler(self.Lx, self.Ly, self.Lx * self.Ly, lambda tiles: ~self.hasFoodArray.ravel()[tiles], self.rng)
+        self.creatureSampler = FreeCellSampler(self.Lx, self.Ly, self.Lx * self.Ly, self.occupancy.freeTiles, self.rng)
 
     def getPoisonVector(self):
 
@@ -150,65 +180,151 @@ class Simulation:
         self.getPoisonVector()
 
 
+    def createNetwork(self, genome=None):
+        return Network(self.memorySize, self.memoryHiddenSizes, self.decisionHiddenSizes, self.rng, genome)
+
     def addCreature(self, x, y, energy, gen, network):
 
-        creature = Creature(energy, x, y, network, gen, self.idCounter)
-        self.creatureArray[x, y] = creature
+        creature = Creature(energy, x, y, gen, self.idCounter, self.networkStore.add(network))
+        self.placeCreature(creature)
+
+    # The child takes its tile right away, its genome is filled in by creatureReplicate
+    def addChild(self, parent, x, y, energy):
+
+        creature = Creature(energy, x, y, parent.gen + 1, self.idCounter, self.networkStore.reserve())
+        self.placeCreature(creature)
+
+        return creature
+
+    def placeCreature(self, creature):
+
+        self.occupancy.set(creature.x, creature.y, creature.slot)
         self.creatureList.append(creature)
+        self.creatureSampler.occupy()
         self.idCounter += 1
 
     def spawnFood(self):
 
-        emptySpots = np.array(np.where(self.hasFoodArray == False))
-        emptySpotCount = len(emptySpots[0, :])
+        xs, ys = self.foodSampler.sample(self.foodSpawnChance)
+        self.addFoods(xs, ys, generateColors(len(xs), self.rng))
 
-        foodSpawnCount = np.random.binomial(emptySpotCount, self.foodSpawnChance)
+    # Adds food on the distinct free tiles (xs[k], ys[k]) with colors[k]
+    def addFoods(self, xs, ys, colors):
+        self.hasFoodArray[xs, ys] = True
+        self.foodColorArray[xs, ys] = colors
+        self.foodChunkManager.addMany(xs, ys)
+        self.foodSampler.occupy(len(xs))
 
-        filledIndices = np.random.choice(range(emptySpotCount), foodSpawnCount, False)
+    def spawnCreatures(self):
 
-        for i in filledIndices:
-            x, y = emptySpots[0, i], emptySpots[1, i]
-            self.addFood(x, y, generateColor())
+        xs, ys = self.creatureSampler.sample(self.creatureSpawnChance)
 
-    def addFood(self, x, y, color):
-        self.hasFoodArray[x, y] = True
-        self.foodColorArray[x, y] = color
-        self.foodChunkManager.add(x, y)
+        for x, y in zip(xs, ys):
 
-    def spawnCreatures(self):
+            self.addCreature(x, y, self.creatureInitEnergy, 0, self.createNetwork())
+
+    # Every creature standing on food decides whether to eat it, the networks of all of them are evaluated at once
+    def creatureFeeding(self):
 
-        emptySpots = np.array(np.where(self.creatureArray == None))
-        emptySpotCount = len(emptySpots[0,:])
+        eaters = [creature for creature in self.creatureList if self.hasFoodArray[creature.x, creature.y]]
 
-        creatureSpawnCount = np.random.binomial(emptySpotCount, self.creatureSpawnChance)
+        if len(eaters) == 0:
+            return
 
-        filledIndices = np.random.choice(range(emptySpotCount), creatureSpawnCount, False)
+        xs = np.array([creature.x for creature in eaters], dtype=int)
+        ys = np.array([creature.y for creature in eaters], dtype=int)
+        slots = np.array([creature.slot for creature in eaters], dtype=int)
 
-        for i in filledIndices:
-            x, y = emptySpots[0, i], emptySpots[1, i]
+        colors = self.foodColorArray[xs, ys]
+        dE = self.foodInitEnergy * (colors @ self.poisonVector)
+        d = self.networkStore.decide(slots, colors)
 
-            network = Network(self.memorySize, self.memoryUpdateRate, self.mutateStd, self.mutateP, self.memoryHiddenSizes, self.decisionHiddenSizes)
-            self.addCreature(x, y, self.creatureInitEnergy, 0, network)
+        self.posEnergyEatenLog.addAll(d[dE > 0])
+        self.negEnergyEatenLog.addAll(d[dE <= 0])
 
-    def creatureFeeding(self):
+        for creature, energy in zip(np.array(eaters)[d], dE[d]):
+            creature.energy += energy
 
-        for creature in self.creatureList:
-            creature.eat(self)
+        self.networkStore.updateMemory(slots[d], colors[d], dE[d])
+        self.energyEatenLog.addAll(dE[d])
+
+        self.hasFoodArray[xs, ys] = False
+        for x, y in zip(xs, ys):
+            self.foodChunkManager.remove(x, y)
+        self.foodSampler.release(len(eaters))
 
     def creatureEnergyDrain(self):
 
         for creature in self.creatureList:
             creature.energy -= self.creatureDrainEnergy
 
+    # Food does not change while creatures walk and a creature is only moved by itself,
+    # so the closest food of every creature can be looked up for all of them before anyone moves
+    # Returns whether each creature in creatureList moved
     def creatureWalk(self):
 
-        for creature in self.creatureList:
-            creature.walk(self)
+        xs = np.array([creature.x for creature in self.creatureList], dtype=int)
+        ys = np.array([creature.y for creature in self.creatureList], dtype=int)
+        hasNearestFood, nearestFood = self.foodChunkManager.nearest(xs, ys, self.creatureSmellRange)
+
+        for i, creature in enumerate(self.creatureList):
+            creature.walk(self, nearestFood[i] if hasNearestFood[i] else None)
 
+        xsNew = np.array([creature.x for creature in self.creatureList], dtype=int)
+        ysNew = np.array([creature.y for creature in self.creatureList], dtype=int)
+
+        return (xsNew != xs) | (ysNew != ys)
+
+    # Every creature that moved this tick passes its memory to each creature next to it with chance memoryShareChance
+    # All adjacent pairs are found at once from the occupancy grid and the memories are copied in one assignment,
+    # every copy reads the memories as they were after walking and when several movers share with the same
+    # creature the one that is later in creatureList wins, like it did when each mover shared right after its move
+    def creatureContact(self, moved):
+
+        if not np.any(moved):
+            return
+
+        movers = [creature for creature, hasMoved in zip(self.creatureList, moved) if hasMoved]
+        xs = np.array([creature.x for creature in movers], dtype=int)
+        ys = np.array([creature.y for creature in movers], dtype=int)
+        slots = np.array([creature.slot for creature in movers], dtype=int)
+
+        # Neighbours in the order of getOccupiedDirections
+        neighbours = self.occupancy.neighbours(xs, ys)
+
+        occupied = neighbours >= 0
+        shares = np.zeros_like(occupied)
+        shares[occupied] = self.rng.random(np.count_nonzero(occupied)) < self.memoryShareChance
+
+        receivers = neighbours[shares]
+        senders = np.broadcast_to(slots[:, None], shares.shape)[shares]
+
+        # NumPy does not say which of repeated indices an assignment keeps, so only the last sender of every receiver is kept
+        receivers, last = np.unique(receivers[::-1], return_index=True)
+        senders = senders[::-1][last]
+
+        memory = self.networkStore.memory
+        memory[receivers] = memory[senders]
+
+    # Children get their turn after everyone alive at the start of the phase, in order of birth,
+    # so the births are handled in rounds and every round of children gets its networks in one batch
     def creatureReplicate(self):
 
-        for creature in self.creatureList:
-            creature.replicate(self)
+        parents = list(self.creatureList)
+
+        while len(parents) > 0:
+
+            births = [(parent, parent.replicate(self)) for parent in parents]
+            births = [(parent, child) for parent, child in births if child is not None]
+
+            if len(births) == 0:
+                return
+
+            parentSlots = np.array([parent.slot for parent, _ in births], dtype=int)
+            childSlots = np.array([child.slot for _, child in births], dtype=int)
+            self.networkStore.copy(parentSlots, childSlots, self.mutateStd, self.mutateP)
+
+            parents = [child for _, child in births]
 
     def updateLog(self):
 
@@ -223,35 +339,23 @@ class Simulation:
 
     def step(self):
 
-        t0 = time.time()
-        self.creatureWalk()
-        t1 = time.time()
+        profiler = self.profiler
+        profiler.start()
+
+        moved = self.creatureWalk()
+        profiler.lap("walk")
+        self.creatureContact(moved)
+        profiler.lap("contact")
         self.creatureFeeding()
-        t2 = time.time()
+        profiler.lap("feeding")
         self.creatureEnergyDrain()
-        t3 = time.time()
+        profiler.lap("drain")
         self.creatureReplicate()
-        t4 = time.time()
+        profiler.lap("replicate")
         self.updatePoison()
-        t5 = time.time()
+        profiler.lap("poison")
         self.spawnFood()
-        t6 = time.time()
-
-        dt1, dt2, dt3, dt4, dt5, dt6 = t1-t0,t2-t1,t3-t2,t4-t3,t5-t4, t6-t5
-        T = dt1+dt2+dt3+dt4+dt5+dt6
-
-        self.tWalkLog.add(dt1)
-        self.tWalkLog.finish()
-
-        # if T > 0 and self.t % 300 == 0:
-        #     print(f"walk: {round(dt1,4)}({round(100*dt1/T,1)}%)")
-        #     print(f"feeding: {round(dt2,4)}({round(100*dt2/T, 1)})%")
-        #     print(f"EnergyDrain: {round(dt3,4)}({round(100*dt3/T, 1)})%")
-        #     print(f"Replicate: {round(dt4,4)}({round(100*dt4/T, 1)})%")
-        #     print(f"updatePoison: {round(dt5,4)}({round(100*dt5/T, 1)})%")
-        #     print(f"SpawnFood: {round(dt6, 4)}({round(100 * dt6 / T, 1)})%")
-        #
-        #     print(f"Walk average: {round(self.tWalkLog.pastAverage(300),4)}")
+        profiler.lap("spawn")
 
         creaturesToDestroy = []
 
@@ -260,13 +364,19 @@ class Simulation:
                 creaturesToDestroy.append(creature)
 
         for creature in creaturesToDestroy:
-            creature.destroy(self)
+            creature.destroy(self, deferRemoval=True)
+
+        self.creatureList.removeAll(creaturesToDestroy)
+        profiler.lap("destroy")
 
         self.updateLog()
 
         if self.runningHidden and self.t % 300 == 0:
             print(f"Simulation progress: {self.t} / {self.totalSteps}")
 
+        profiler.lap("logging")
+        profiler.finish()
+
         # if self.t % 50 == 0:
         #     gens = [creature.gen for creature in self.creatureList]
         #     genAvg = np.average(gens)
@@ -282,6 +392,8 @@ class Simulation:
 
     def drawFPS(self, batch):
 
+        import pyglet
+
         yMax = self.Ly * self.creatureSize
 
         fps = 1 / self.dtLog.pastAverage(3)
@@ -292,64 +404,43 @@ class Simulation:
         return textDrawing
 
 
-    def drawFood(self, batch):
+    # Color of every tile, either the food color itself or green/red for how much energy the food gives
+    def foodColors(self):
 
+        colors = np.zeros((self.Lx, self.Ly, 3), dtype=np.uint8)
 
-        size = self.creatureSize
+        if self.foodAppearanceSlider.on:
+            cFood = np.array([50, 225, 30])
+            cPoison = np.array([255, 0, 0])
 
-        foodDrawings = []
-        for x in range(self.Lx):
-            for y in range(self.Ly):
+            sFood = self.foodInitEnergy * (self.foodColorArray @ self.poisonVector) / (3 * self.foodInitEnergy * self.poisonStd**2)
+            sFood = np.clip(sFood, -1, 1)[:, :, None]
 
-                if not self.hasFoodArray[x, y]:
-                    continue
+            tileColors = np.where(sFood > 0, sFood * cFood, -sFood * cPoison)
+        else:
+            tileColors = self.foodColorArray * 255
 
-                if self.foodAppearanceSlider.on:
-                    cFood = (50, 225, 30)
-                    cPoison = (255, 0, 0)
+        colors[self.hasFoodArray] = tileColors[self.hasFoodArray].astype(np.uint8)
+        return colors
 
-                    sFood = self.getFoodEnergy(self.foodColorArray[x, y]) / (3 * self.foodInitEnergy * self.poisonStd**2)
-                    if sFood > 1:
-                        sFood = 1
-                    if sFood < -1:
-                        sFood = -1
+    def drawFood(self):
+        self.renderer.drawGrid(self.foodColors())
 
-                    if sFood > 0:
-                        color = [int(sFood * cFood[i]) for i in range(len(cFood))]
-                    else:
-                        color = [int(-sFood * cPoison[i]) for i in range(len(cPoison))]
+    def drawCreatures(self):
 
-                    foodDrawing = shapes.Rectangle(size * x, size * y, size, size, color=color, batch=batch)
-                    foodDrawings.append(foodDrawing)
+        x = np.array([creature.x for creature in self.creatureList], dtype=int)
+        y = np.array([creature.y for creature in self.creatureList], dtype=int)
+        energy = np.array([creature.energy for creature in self.creatureList], dtype=float)
 
-                else:
+        s = np.clip(energy / self.creatureInitEnergy, 0.5, 1)[:, None]
+        creatureColors = (s * np.array(creatureBlue)).astype(np.uint8)
 
-                    color = [int(c * 255) for c in self.foodColorArray[x, y]]
-
-                    foodDrawing = shapes.Rectangle(size * x, size * y, size, size, color=color, batch=batch)
-                    foodDrawings.append(foodDrawing)
-
-        return foodDrawings
-
-    def drawCreatures(self, batch):
-
-        creatureDrawings = []
-        color = creatureBlue
-        size = self.creatureSize
-
-        for creature in self.creatureList:
-            s = min(1, creature.energy / self.creatureInitEnergy)
-            s = max(0.5, s)
-
-            creatureColor = [int(s * color[i]) for i in range(len(color))]
-            creatureDrawing = shapes.Circle(size * (creature.x+0.5), size * (creature.y+0.5), 0.5*size, color=creatureColor, batch=batch)
-
-            creatureDrawings.append(creatureDrawing)
-
-        return creatureDrawings
+        self.renderer.drawCreatures(x, y, creatureColors)
 
     def drawSidebar(self, batch):
 
+        from pyglet import shapes
+
         xMax = self.Lx * self.creatureSize
         yMax = self.Ly * self.creatureSize
         L = self.sidebarLength
@@ -359,6 +450,9 @@ class Simulation:
     # Draws graph on the right showing energy values for different food colors
     def drawPoisonGraph(self, batch):
 
+        import pyglet
+        from pyglet import shapes
+
         xMax = self.Lx * self.creatureSize
         yMax = self.Ly * self.creatureSize
         L = self.sidebarLength
@@ -401,6 +495,9 @@ class Simulation:
 
     def drawEatingGraph(self, batch):
 
+        import pyglet
+        from pyglet import shapes
+
         L = self.sidebarLength
         xMax = self.Lx * self.creatureSize
         yMax = self.Ly * self.creatureSize - 2 * L
@@ -449,21 +546,51 @@ class Simulation:
 
         return barDrawings
 
+    # Lists the average time and share of every phase over the last steps next to the profiler slider
+    def drawProfiler(self, batch):
+
+        if not self.profiler.enabled:
+            return []
+
+        import pyglet
+
+        L = self.sidebarLength
+        xMax = self.Lx * self.creatureSize
+        yMax = self.Ly * self.creatureSize - 1.45 * L
+        lineHeight = 0.06 * L
+
+        averages = self.profiler.recentAverages()
+        total = max(np.sum(averages), 1e-12)
+
+        textDrawings = []
+        for i, phase in enumerate(self.profiler.phases):
+            text = f"{phase}: {round(1000 * averages[i], 2)}ms ({round(100 * averages[i] / total)}%)"
+            textDrawing = pyglet.text.Label(text, x=xMax + 0.5 * L, y=yMax - i * lineHeight, batch=batch,
+                                            font_size=9, color=[0, 0, 0, 255])
+            textDrawings.append(textDrawing)
+
+        return textDrawings
+
 
     def draw(self):
 
+        import pyglet
+
         self.window.clear()
 
-        batch = pyglet.graphics.Batch()
+        if self.renderer is None:
+            self.renderer = GridRenderer(self.Lx, self.Ly, self.creatureSize)
 
         if not self.showGraphicsSlider.on:
-            foodDrawings = self.drawFood(batch)
-            creatureDrawings = self.drawCreatures(batch)
+            self.drawFood()
+            self.drawCreatures()
 
+        batch = pyglet.graphics.Batch()
 
         sidebar = self.drawSidebar(batch)
         poisonGraphDrawings = self.drawPoisonGraph(batch)
         eatingGraphsDrawings = self.drawEatingGraph(batch)
+        profilerDrawings = self.drawProfiler(batch)
         fps = self.drawFPS(batch)
 
         buttonDrawings = []
@@ -472,9 +599,13 @@ class Simulation:
 
         batch.draw()
 
+    # pyglet is only imported by run and the drawing methods, so runHidden works without it
     def run(self):
 
+        import pyglet
+
         self.runningHidden = False
+        self.setButtons()
         self.window = pyglet.window.Window(self.Lx * self.creatureSize + self.sidebarLength, self.Ly * self.creatureSize)
 
         @self.window.event
@@ -495,17 +626,30 @@ class Simulation:
 
         self.window.close()
 
-    def runHidden(self, steps):
+    # Settings that runHidden(steps) returns, known before the run so sweeps can check their results folders first
+    def hiddenSettings(self, steps):
 
-        self.runningHidden = True
         self.totalSteps = steps
-        self.settings = Settings(self)
+        return Settings(self)
+
+    # If profilePath is given the phases are profiled and the profiler is saved there as a .npz file
+    def runHidden(self, steps, profilePath=None):
+
+        self.runningHidden = True
+        self.settings = self.hiddenSettings(steps)
+
+        if profilePath is not None:
+            self.profiler.enabled = True
 
         for _ in range(steps):
             self.step()
 
         results = Results(self)
 
+        if profilePath is not None:
+            self.profiler.save(profilePath)
+            print(self.profiler.summary())
+
         return self.settings, results
 
         #save(self.settings, results)
@@ -516,8 +660,8 @@ class Simulation:
 #     sim = Simulation(Lx, Ly)
 #     return sim.runHidden(steps)
 
-def runSimHidden(id):
-    sim = Simulation(100, 100)
+def runSimHidden(id, seed):
+    sim = Simulation(100, 100, seed)
     return sim.runHidden(50000)
 
 def runSim(Lx, Ly):
@@ -529,22 +673,5 @@ if __name__ == "__main__":
 
     # runSim(100, 100)
 
-
-    settingsList, resultsList = runAsync(runSimHidden, 20)
-
-    for i in range(len(settingsList)):
-        settings, results = settingsList[i], resultsList[i]
-        save(settings, results)
-
-
-
-
-
-
-
-
-
-
-
-
-
+    settings = Simulation(100, 100).hiddenSettings(50000)
+    runSweep(runSimHidden, 20, findResultsFolder(settings), settings)
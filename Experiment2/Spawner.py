@@ -0,0 +1,56 @@
+#-----Imports-----#
+import numpy as np
+
+
+# Picks random free tiles for spawning without scanning the whole grid every tick
+# The simulation keeps freeCount up to date through occupy and release, tiles are then drawn by rejection:
+# random tiles are tested with isFree until enough distinct free ones are found
+class FreeCellSampler:
+
+    def __init__(self, Lx, Ly, freeCount, isFree, rng):
+
+        self.Lx, self.Ly = Lx, Ly
+        self.size = Lx * Ly
+        self.freeCount = freeCount
+        self.isFree = isFree  # Maps an array of flat tile indices to whether those tiles are free
+        self.rng = rng
+
+        # Below this fraction of free tiles rejection wastes too many draws and a full scan is cheaper
+        self.minFreeFraction = 0.05
+
+    def occupy(self, count=1):
+        self.freeCount -= count
+
+    def release(self, count=1):
+        self.freeCount += count
+
+    # Every free tile is selected with chance p, returns the x and y coordinates of the selected tiles
+    def sample(self, p):
+
+        count = self.rng.binomial(self.freeCount, p)
+        return self.sampleCount(count)
+
+    # Returns the coordinates of count distinct free tiles, chosen uniformly
+    def sampleCount(self, count):
+
+        if count == 0:
+            return np.zeros(0, dtype=int), np.zeros(0, dtype=int)
+
+        if self.freeCount < max(2 * count, self.minFreeFraction * self.size):
+            freeTiles = np.flatnonzero(self.isFree(np.arange(self.size)))
+            chosen = self.rng.choice(freeTiles, count, replace=False)
+            return np.unravel_index(chosen, (self.Lx, self.Ly))
+
+        chosen = np.zeros(0, dtype=int)
+        while len(chosen) < count:
+
+            # Draw enough candidates to find the missing tiles in one go most of the time
+            missing = count - len(chosen)
+            candidates = self.rng.integers(self.size, size=int(1.2 * missing * self.size / self.freeCount) + 8)
+            candidates = np.concatenate([chosen, candidates[self.isFree(candidates)]])
+
+            # Drop tiles that were drawn twice, keeping the order in which they were drawn
+            _, first = np.unique(candidates, return_index=True)
+            chosen = candidates[np.sort(first)]
+
+        return np.unravel_index(chosen[:count], (self.Lx, self.Ly))
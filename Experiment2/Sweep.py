@@ -0,0 +1,109 @@
+#-----Imports-----#
+import argparse
+import functools
+import itertools
+import json
+import numpy as np
+
+#-----InternalImports-----#
+from Simulation2 import Simulation
+from Settings import Settings
+from Parallelizer import runGridSweep
+
+
+# Grid keys besides the names in Settings.names
+# size is the world size [Lx, Ly], poisonPeriod is Tpoison of Simulation: the poison angle turns by 2pi/3 every poisonPeriod steps
+extraNames = ["size", "poisonPeriod"]
+
+
+# Every combination of the values in grid, which maps names to lists of values, as a list of settings dicts
+def gridSettings(grid):
+
+    names = list(grid.keys())
+    return [dict(zip(names, values)) for values in itertools.product(*grid.values())]
+
+
+# Name of the results folder of a setting, lists are joined with - so that the names stay plain
+def settingName(setting):
+
+    parts = []
+    for name, value in setting.items():
+        if isinstance(value, list):
+            value = "-".join(str(v) for v in value)
+        parts.append(f"{name}={value}")
+
+    return "_".join(parts) if len(parts) > 0 else "default"
+
+
+# The simulation of a setting, with the extra names turned into what Simulation takes
+def createSimulation(setting, seed):
+
+    setting = dict(setting)
+    Lx, Ly = setting.pop("size", [100, 100])
+
+    if "poisonPeriod" in setting:
+        setting["poisonChangeRate"] = (2/3) * np.pi / setting.pop("poisonPeriod")
+
+    return Simulation(Lx, Ly, seed, setting)
+
+
+# Runs one simulation of the setting without graphics, pyglet is never imported on this path
+def runSetting(setting, seed, steps):
+    return createSimulation(setting, seed).runHidden(steps)
+
+
+# Runs nRuns simulations of every setting in the grid over one process pool, the runs of a setting are saved
+# in their own results folder inside outputFolder
+def runGrid(grid, steps, nRuns, outputFolder, seed=0, workers=None):
+
+    for name in grid:
+        if name not in Settings.names and name not in extraNames:
+            raise ValueError(f"Unknown setting {name}")
+
+    settingsList = gridSettings(grid)
+    paths = [f"{outputFolder}/{settingName(setting)}" for setting in settingsList]
+    folderSettings = [createSimulation(setting, seed).hiddenSettings(steps) for setting in settingsList]
+
+    print(f"Sweeping {len(settingsList)} settings with {nRuns} runs each")
+    runGridSweep(functools.partial(runSetting, steps=steps), settingsList, paths, folderSettings, nRuns, seed, workers)
+
+
+# Reads NAME=VALUES arguments where VALUES is a json list, a single value is read as a list of one value
+def parseGrid(arguments):
+
+    grid = {}
+    for argument in arguments:
+
+        name, _, values = argument.partition("=")
+        values = json.loads(values)
+        grid[name] = values if isinstance(values, list) else [values]
+
+    return grid
+
+
+if __name__ == "__main__":
+
+    parser = argparse.ArgumentParser(description="Run a grid of Experiment2 settings without graphics")
+    parser.add_argument("grid", nargs="*", metavar="NAME=VALUES",
+                        help="A setting and a json list of its values, for example mutateP=[0.01,0.02] "
+                             "memoryHiddenSizes=[[10],[20,10]] size=[[100,100],[200,200]] poisonPeriod=[1750,3500]")
+    parser.add_argument("--steps", type=int, default=50000)
+    parser.add_argument("--runs", type=int, default=20, help="Number of runs of every setting")
+    parser.add_argument("--seed", type=int, default=0, help="Root seed every run derives its own random stream from")
+    parser.add_argument("--workers", type=int, default=None, help="Size of the process pool, defaults to the number of cores")
+    parser.add_argument("--output", default="SweepResults")
+    args = parser.parse_args()
+
+    try:
+        grid = parseGrid(args.grid)
+    except json.JSONDecodeError as exc:
+        parser.error(f"Values of a setting must be a json list: {exc}")
+
+    unknown = [name for name in grid if name not in Settings.names and name not in extraNames]
+    if len(unknown) > 0:
+        parser.error(f"Unknown settings {', '.join(unknown)}, choose from {', '.join(Settings.names + extraNames)}")
+
+    try:
+        runGrid(grid, args.steps, args.runs, args.output, args.seed, args.workers)
+    except ValueError as exc:
+        parser.error(str(exc))
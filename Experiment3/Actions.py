@@ -69,7 +69,7 @@ class SelectTargetAgent(Action):
                 agentList.append(queriedAgent)
 
         if len(agentList) > 0:
-            agent.targetAgent = np.random.choice(agentList)
+            agent.targetAgent = sim.rng.choice(agentList)
             return True
         return False
 
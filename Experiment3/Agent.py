@@ -32,15 +32,12 @@ class Agent:
         if xNew < 0 or yNew < 0 or xNew >= sim.Lx or yNew >= sim.Ly:
             return
 
-        for i, creature in enumerate(sim.creatureArray[self.x, self.y]):
-            if creature.id == self.id:
-                del sim.creatureArray[self.x, self.y][i]
-                break
+        sim.agentCountArray[self.x, self.y] -= 1
 
         self.x = xNew
         self.y = yNew
 
-        sim.creatureArray[xNew, yNew].append(self)
+        sim.agentCountArray[xNew, yNew] += 1
 
     def gatherFood(self, sim):
 
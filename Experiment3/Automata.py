@@ -87,7 +87,7 @@ class Automata(Brain):
 
         # If more than one condition is met, select a random edge to follow
         if len(nextNodes) > 0:
-            nextNode = np.random.choice(nextNodes)
+            nextNode = sim.rng.choice(nextNodes)
 
             action = self.actionArray[agent.currentNode, nextNode]
             if action is not None:
@@ -197,7 +197,7 @@ class Automata(Brain):
 
     def mutateConditionAmount(self, op: OptimizationParameters):
 
-        amount = np.random.poisson(self.n * (self.n - 1) * op.conditionAmountMutateRate)
+        amount = op.rng.poisson(self.n * (self.n - 1) * op.conditionAmountMutateRate)
 
         if amount == 0:
             return
@@ -212,11 +212,11 @@ class Automata(Brain):
                 else:
                     filledSlots.append((i,j))
 
-        if np.random.random() < 0.5:
+        if op.rng.random() < 0.5:
             if len(emptySlots) < amount:
                 amount = len(emptySlots)
 
-            selectedSlotIds = np.random.choice(len(emptySlots), size=amount, replace=False)
+            selectedSlotIds = op.rng.choice(len(emptySlots), size=amount, replace=False)
 
             for id in selectedSlotIds:
                 i, j = emptySlots[id]
@@ -226,7 +226,7 @@ class Automata(Brain):
             if len(filledSlots) < amount:
                 amount = len(filledSlots)
 
-            selectedSlotIds = np.random.choice(len(filledSlots), size=amount, replace=False)
+            selectedSlotIds = op.rng.choice(len(filledSlots), size=amount, replace=False)
 
             for id in selectedSlotIds:
                 i, j = filledSlots[id]
@@ -234,27 +234,27 @@ class Automata(Brain):
 
     def mutateFinishEdges(self, op:OptimizationParameters):
 
-        mutations = np.random.poisson(self.n * op.finEdgeMutationRate)
+        mutations = op.rng.poisson(self.n * op.finEdgeMutationRate)
 
         for _ in range(mutations):
-            i, j = np.random.choice(self.n, size=2, replace=False)
+            i, j = op.rng.choice(self.n, size=2, replace=False)
             self.finishEdgeArray[i] = j
 
     def mutateActions(self, op: OptimizationParameters):
 
         for i in range(self.n):
             action = self.finishActionArray[i]
-            if action is not None and np.random.random() < op.actionMutationRate:
+            if action is not None and op.rng.random() < op.actionMutationRate:
                 action.mutate(op)
-            if np.random.random() < op.actionResetChance:
+            if op.rng.random() < op.actionResetChance:
                 self.finishActionArray[i] = generateRandomAction(op)
 
         for i in range(self.n):
             for j in range(self.n):
                 action = self.actionArray[i, j]
-                if action is not None and np.random.random() < op.actionMutationRate:
+                if action is not None and op.rng.random() < op.actionMutationRate:
                     action.mutate(op)
-                if np.random.random() < op.actionResetChance:
+                if op.rng.random() < op.actionResetChance:
                     self.actionArray[i, j] = generateRandomAction(op)
 
     def size(self) -> int:
@@ -11,8 +11,8 @@ from Saver import save
 import time
 from Pathfinder import *
 
-def run(i, map, automata, simSettings, tMax):
-    return runSimHidden(i, map, automata, simSettings, tMax)
+def run(i, map, automata, simSettings, tMax, seed=None):
+    return runSimHidden(i, map, automata, simSettings, tMax, seed)
 
 
 class GeneralExpSettings:
@@ -218,7 +218,7 @@ def runGeneralExperiment(mapClass, mapSettingsArray, simSettingsArray, brainArra
 
     if len(mapSettingsArray) == 1:
         mapSettings = mapSettingsArray[0]
-        map = mapClass(mapSettings).init()
+        map = mapClass(mapSettings).init(op.seedSequence.spawn(1)[0])
         pathfinder = Pathfinder(map).init()
         maxScore = map.calculateMaxScore(op.tMax, map.creatureCount, pathfinder)
         maxAUC = map.calculateMaxAUC(op.tMax, map.creatureCount, pathfinder)
@@ -234,7 +234,7 @@ def runGeneralExperiment(mapClass, mapSettingsArray, simSettingsArray, brainArra
 
         if len(mapSettingsArray) > 1:
             mapSettings = mapSettingsArray[index]
-            map = mapClass(mapSettings).init()
+            map = mapClass(mapSettings).init(op.seedSequence.spawn(1)[0])
             pathfinder = Pathfinder(map).init()
             maxScore = map.calculateMaxScore(op.tMax, map.creatureCount, pathfinder)
             maxAUC = map.calculateMaxAUC(op.tMax, map.creatureCount, pathfinder)
@@ -126,10 +126,10 @@ class CommunicationLoop(Loop):
         else:
 
             # Determine how many agents can be communicated with
-            nQueried = min(len(selectedAgents), np.random.poisson(sim.nComm))
+            nQueried = min(len(selectedAgents), sim.rng.poisson(sim.nComm))
 
             # Randomly select which agents are communicated with
-            agent.queriedAgents = list(np.random.choice(selectedAgents, nQueried, replace=False))
+            agent.queriedAgents = list(sim.rng.choice(selectedAgents, nQueried, replace=False))
 
     # Set the next agent to communicate with
     def step(self, sim, agent):
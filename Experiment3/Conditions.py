@@ -411,7 +411,7 @@ class RandomChance(AtomicBoolean):
         self.p = p
 
     def sense(self, sim, agent) -> bool:
-        return np.random.random() < self.p.evaluate(sim, agent)
+        return sim.rng.random() < self.p.evaluate(sim, agent)
 
     def varName(self) -> str:
         return f"random(p={self.p.toString()})"
@@ -440,12 +440,10 @@ class HasNearbyFood(AtomicBoolean):
 
     def sense(self, sim, agent) -> bool:
 
-        for x, y in sim.foodChunkManager.getNeighbours(agent.x, agent.y):
-            distance = sim.getDistance(agent.x, agent.y, x, y)
-            if distance <= sim.smellRange:
-                return True
+        foodPositions = sim.foodChunkManager.getNeighbours(agent.x, agent.y)
+        distances = sim.getDistance(agent.x, agent.y, foodPositions[:, 0], foodPositions[:, 1])
 
-        return False
+        return bool(np.any(distances <= sim.smellRange))
 
     def varName(self) -> str:
         return "HasNearbyFood"
@@ -471,13 +469,10 @@ class NearbyFoodAmount(DynamicValue):
 
     def sense(self, sim, agent):
 
-        foodCount = 0
-        for x, y in sim.foodChunkManager.getNeighbours(agent.x, agent.y):
-            distance = sim.getDistance(agent.x, agent.y, x, y)
-            if distance <= sim.smellRange:
-                foodCount += 1
+        foodPositions = sim.foodChunkManager.getNeighbours(agent.x, agent.y)
+        distances = sim.getDistance(agent.x, agent.y, foodPositions[:, 0], foodPositions[:, 1])
 
-        return foodCount
+        return int(np.count_nonzero(distances <= sim.smellRange))
 
     def varName(self) -> str:
         return "NearbyFood"
@@ -663,8 +658,8 @@ class CheckInternalFloat(DynamicValue):
         value = agent.floatArray[self.index]
 
         # If checking memory of other agent, sometimes distort the data
-        if self.target != "self" and np.random.random() < sim.pDistortFloat:
-            distortion = np.random.normal(0, sim.stdDistortFloat)
+        if self.target != "self" and sim.rng.random() < sim.pDistortFloat:
+            distortion = sim.rng.normal(0, sim.stdDistortFloat)
             value *= 2**distortion
         return value
 
@@ -685,11 +680,11 @@ class CheckInternalCoord(DynamicValue):
         xCoord, yCoord = agent.coordsArray[self.index, :]
 
         # If reading memory of other agent, sometimes distort the coordinate
-        if self.target != "self" and np.random.random() < sim.pDistortCoord:
-            nDistort = np.random.poisson(sim.stdDistortCoord)
+        if self.target != "self" and sim.rng.random() < sim.pDistortCoord:
+            nDistort = sim.rng.poisson(sim.stdDistortCoord)
             for _ in range(nDistort):
                 nextCoords = sim.pathfinder.getPrev(xCoord, yCoord, xCoord, yCoord)
-                xCoord, yCoord = nextCoords[np.random.randint(len(nextCoords))]
+                xCoord, yCoord = nextCoords[sim.rng.integers(len(nextCoords))]
 
         return [xCoord, yCoord]
 
@@ -711,7 +706,11 @@ def getValueFactories():
 
 class OptimizationParameters:
 
-    def __init__(self):
+    # The mutation methods draw from rng, the simulations of every generation get their seeds from seedSequence
+    def __init__(self, seed=None):
+        self.seedSequence = np.random.SeedSequence(seed)
+        self.rng = np.random.default_rng(self.seedSequence.spawn(1)[0])
+
         self.pNOT = 0.15
         self.pConst = 0.4
         self.pTargetSelf = 0.9
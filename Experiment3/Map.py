@@ -41,8 +41,10 @@ class Map:
     def isValidPosition(self, x, y):
         return x >= 0 and y >= 0 and x < self.Lx and y < self.Ly and not self.hasWallArray[x, y]
 
-    def init(self):
+    # Random maps draw from rng, seed can be an int, a SeedSequence or the Generator of a run
+    def init(self, seed=None):
         print("Generating map...")
+        self.rng = np.random.default_rng(seed)
         self.generate()
         self.setupNeighbours()
         return self
@@ -235,11 +237,11 @@ class CircleMap(Map):
 
         dMin, dMax = self.foodDensityRange
         for _ in range(self.foodAmount):
-            x, y = np.random.randint(self.Lx), np.random.randint(self.Lx)
+            x, y = self.rng.integers(self.Lx), self.rng.integers(self.Ly)
             if self.hasWallArray[x, y]:
                 continue
 
-            density = np.random.randint(dMin, dMax+1)
+            density = self.rng.integers(dMin, dMax+1)
             self.foodAmountArray[x, y] += self.foodAmount
             self.foodDensityArray[x, y] = density
 
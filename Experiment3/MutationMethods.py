@@ -13,18 +13,18 @@ def generateRandomCondition(op: OptimizationParameters, isQueried: bool=False):
     pBool = len(booleanFactories) / (len(booleanFactories) + len(valueFactories))
 
     # Randomly decide if we want to use one of the atomic booleans as extra condition
-    if np.random.random() < pBool:
+    if op.rng.random() < pBool:
         return generateRandomBoolean(op, isQueried)
     else:
         # If not we use an inequality
         # First decide if the inequality contains a constant
-        if np.random.random() < op.pConst:
+        if op.rng.random() < op.pConst:
 
-            constValue = np.random.randint(op.constMin, op.constMax)
+            constValue = op.rng.integers(op.constMin, op.constMax)
             constant = Constant(constValue)
             value = generateRandomValue(op, isQueried)
 
-            if np.random.random() < 0.5:
+            if op.rng.random() < 0.5:
                 leftValue = constant
                 rightValue = value
             else:
@@ -37,14 +37,14 @@ def generateRandomCondition(op: OptimizationParameters, isQueried: bool=False):
 
 def mutateCondition(condition: Condition, op: OptimizationParameters, isQueried: bool=False):
 
-    mutations = np.random.poisson(op.conditionMutateRate) - np.random.poisson(op.conditionMutateRate)
+    mutations = op.rng.poisson(op.conditionMutateRate) - op.rng.poisson(op.conditionMutateRate)
 
     if mutations > 0:
         for _ in range(mutations):
             condition = ExpandCondition(condition, op, isQueried)
     elif mutations < 0:
         for _ in range(-mutations):
-            condition = reduceCondition(condition)
+            condition = reduceCondition(condition, op)
 
     return condition
 
@@ -56,10 +56,10 @@ def ExpandCondition(condition: Condition, op: OptimizationParameters, isQueried:
 
     # Randomly select where to mutate
     descendants = condition.getDescendants()
-    child, parentInfo = descendants[np.random.randint(len(descendants))]
+    child, parentInfo = descendants[op.rng.integers(len(descendants))]
 
     # Randomly decide if we add a NOT operator
-    if np.random.random() < op.pNOT:
+    if op.rng.random() < op.pNOT:
         operator = NOT(child)
     else:
 
@@ -67,7 +67,7 @@ def ExpandCondition(condition: Condition, op: OptimizationParameters, isQueried:
         newCond = generateRandomCondition(op, isQueried)
 
         # Decide whether to use AND or OR
-        if np.random.random() < 0.5:
+        if op.rng.random() < 0.5:
             operator = AND(child, newCond)
         else:
             operator = OR(child, newCond)
@@ -85,7 +85,7 @@ def ExpandCondition(condition: Condition, op: OptimizationParameters, isQueried:
         return condition
 
 # Reduce the size of the condition by 1 by randomly removing an operator
-def reduceCondition(condition: Condition):
+def reduceCondition(condition: Condition, op: OptimizationParameters):
 
     if condition is None:
         return None
@@ -96,7 +96,7 @@ def reduceCondition(condition: Condition):
     if len(removeables) == 0:
         return condition
 
-    child, parentInfo = removeables[np.random.randint(len(removeables))]
+    child, parentInfo = removeables[op.rng.integers(len(removeables))]
     parent, parentIndex = parentInfo
 
     if parent is None:
@@ -112,27 +112,27 @@ def reduceCondition(condition: Condition):
 
 def generateRandomBoolean(op: OptimizationParameters, isQueried: bool=False):
     booleanFactories = Conditions.getBooleanFactories()
-    if isQueried and np.random.random() < op.pQueriedValue:
+    if isQueried and op.rng.random() < op.pQueriedValue:
         target = "queried"
-    elif np.random.random() < op.pTargetSelf:
+    elif op.rng.random() < op.pTargetSelf:
         target = "self"
     else:
         target = "saved"
-    return booleanFactories[np.random.randint(len(booleanFactories))](target)
+    return booleanFactories[op.rng.integers(len(booleanFactories))](target)
 
 def generateRandomValue(op: OptimizationParameters, isQueried: bool=False):
     valueFactories = Conditions.getValueFactories()
-    if isQueried and np.random.random() < op.pQueriedValue:
+    if isQueried and op.rng.random() < op.pQueriedValue:
         target = "queried"
-    elif np.random.random() < op.pTargetSelf:
+    elif op.rng.random() < op.pTargetSelf:
         target = "self"
     else:
         target = "saved"
-    return valueFactories[np.random.randint(len(valueFactories))](target)
+    return valueFactories[op.rng.integers(len(valueFactories))](target)
 
 def generateRandomAction(op: OptimizationParameters):
     actionFactories = Actions.getActionFactories()
-    return np.random.choice(actionFactories)()
+    return actionFactories[op.rng.integers(len(actionFactories))]()
 
 
 
@@ -35,14 +35,14 @@ class Results:
         self.automataArray = automataArray
 
 
-def TournamentSelection(automataList, scoreList, tournamentSize=3):
-    selectedIndices = np.random.choice(range(len(automataList)), size=tournamentSize)
+def TournamentSelection(automataList, scoreList, rng, tournamentSize=3):
+    selectedIndices = rng.choice(len(automataList), size=tournamentSize)
     imax = np.argmax([scoreList[ind] for ind in selectedIndices])
     return automataList[selectedIndices[imax]]
 
-def run(i, map, simSettings, automataList, tMax):
+def run(i, map, simSettings, automataList, tMax, seed=None):
 
-    score = runSimHidden(i, map, automataList[i], simSettings, tMax)
+    score = runSimHidden(i, map, automataList[i], simSettings, tMax, seed)
     return score
 
 def optimize(map, simSettings, baseAutomata, op):
@@ -59,8 +59,8 @@ def optimize(map, simSettings, baseAutomata, op):
 
         startTime = time.time()
 
-        # Run simulations to determine performance of each automata
-        scoreList = runAsync(run, op.n, [map, simSettings, automataList, op.tMax])
+        # Run simulations to determine performance of each automata, every generation gets fresh random streams
+        scoreList = runAsync(run, op.n, [map, simSettings, automataList, op.tMax], seed=op.seedSequence.spawn(1)[0])
 
         # Remember best performing automata
         iMax = np.argmax(scoreList)
@@ -76,10 +76,10 @@ def optimize(map, simSettings, baseAutomata, op):
         # Select new population based on performance and mutate selected automata
         newAutomataList = []
         for _ in range(op.n):
-            if np.random.random() < op.elitismChance:
+            if op.rng.random() < op.elitismChance:
                 automata = bestAutomata.createOffspring(op)
             else:
-                automata = TournamentSelection(automataList, scoreList).createOffspring(op)
+                automata = TournamentSelection(automataList, scoreList, op.rng).createOffspring(op)
             newAutomataList.append(automata)
 
         automataList = newAutomataList
@@ -106,7 +106,7 @@ if __name__ == "__main__":
     mapSettings = FourRoomsMapSettings(6, 6, 6, 1, creatureCount, 10*creatureCount, 1, 2, 4, 8)
     map = FourRoomsMap(mapSettings).init()
     # mapSettings = CircleMapSettings(8,10, creatureCount, [1,4], 10)
-    # map = CircleMap(mapSettings).init()
+    # map = CircleMap(mapSettings).init(op.seedSequence.spawn(1)[0])
 
     automata = Automata().initBaseAutomata()
 
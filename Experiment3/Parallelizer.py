@@ -3,7 +3,13 @@
 import concurrent.futures
 import numpy as np
 
-def runAsync(func, nRuns, args=[], maxSize=200):
+# Calls func(i, *args, seed=...) for i in 0..nRuns-1 over a process pool, every run gets its own child of the SeedSequence
+# of seed so that no two runs share a random stream, seed can be an int, a SeedSequence or None for fresh entropy
+def runAsync(func, nRuns, args=[], maxSize=200, seed=None):
+
+    if not isinstance(seed, np.random.SeedSequence):
+        seed = np.random.SeedSequence(seed)
+    seeds = seed.spawn(nRuns)
 
     resultsList = np.empty(nRuns, dtype=list)
 
@@ -20,7 +26,7 @@ def runAsync(func, nRuns, args=[], maxSize=200):
 
         with concurrent.futures.ProcessPoolExecutor() as executor:
 
-            futures = [executor.submit(func, i, *args) for i in range(currentRuns)]
+            futures = [executor.submit(func, i, *args, seed=seeds[i + runsLeft]) for i in range(currentRuns)]
             for future in concurrent.futures.as_completed(futures):
                 try:
                      i, results = future.result()
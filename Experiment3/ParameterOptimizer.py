@@ -19,11 +19,11 @@ class Parameters:
         self.pMutate = pMutate
         self.mutateStdCoefficient = mutateStdCoefficient
 
-    def generate(self):
+    def generate(self, rng):
 
         for key in self.valueDict.keys():
             yMin, yMax = self.yMinDict[key], self.yMaxDict[key]
-            self.valueDict[key] = np.random.uniform(yMin, yMax)
+            self.valueDict[key] = rng.uniform(yMin, yMax)
 
         return self
 
@@ -33,12 +33,13 @@ class Parameters:
         self.yMinDict[name] = yMin
         self.yMaxDict[name] = yMax
 
-    def get(self, name):
+    # Int parameters are rounded up with a chance equal to their fractional part
+    def get(self, name, rng):
 
         y = self.valueDict[name]
         if self.typeDict[name] == "int":
             dy = y - int(y)
-            if np.random.random() < dy:
+            if rng.random() < dy:
                 y = int(y) + 1
             else:
                 y = int(y)
@@ -56,14 +57,14 @@ class Parameters:
         child.yMaxDict = self.yMaxDict.copy()
         return child
 
-    def mutate(self):
+    def mutate(self, rng):
 
         for key in self.valueDict.keys():
-            if not np.random.random() < self.pMutate:
+            if not rng.random() < self.pMutate:
                 continue
 
             yMin, yMax = self.yMinDict[key], self.yMaxDict[key]
-            dy = np.random.normal(0, self.mutateStdCoefficient * (yMax - yMin))
+            dy = rng.normal(0, self.mutateStdCoefficient * (yMax - yMin))
             yNew = self.valueDict[key] + dy
 
             if yNew > yMax:
@@ -100,14 +101,17 @@ class Parameters:
 
 class ParameterOptimizer:
 
-    def __init__(self, parameterSettings, fitnessFunction, fitnessArgs):
+    # Selection and mutation draw from rng, every batch of fitness runs gets its seeds from seedSequence
+    def __init__(self, parameterSettings, fitnessFunction, fitnessArgs, seed=None):
         self.parameterSettings = parameterSettings
         self.fitnessFunction = fitnessFunction
         self.fitnessArgs = fitnessArgs
+        self.seedSequence = np.random.SeedSequence(seed)
+        self.rng = np.random.default_rng(self.seedSequence.spawn(1)[0])
 
     def run(self, nSteps, nRunsPerStep, popSize):
 
-        parameterList = [self.parameterSettings.copy().generate() for _ in range(popSize)]
+        parameterList = [self.parameterSettings.copy().generate(self.rng) for _ in range(popSize)]
         parameterArray = [parameterList]
         for step in range(nSteps):
 
@@ -121,7 +125,7 @@ class ParameterOptimizer:
                 newParameterList.append(parent1.crossover(parent2))
 
             parameterArray.append(newParameterList)
-            parameterList = [parameter.mutate() for parameter in newParameterList]
+            parameterList = [parameter.mutate(self.rng) for parameter in newParameterList]
 
 
 
@@ -134,13 +138,13 @@ class ParameterOptimizer:
         for i in range(len(parameterList)):
             print(f"Evaluating parameters {i}")
             args = self.fitnessArgs + [parameterList[i]]
-            fitness = np.average(runAsync(self.fitnessFunction, nRunsPerStep, args))
+            fitness = np.average(runAsync(self.fitnessFunction, nRunsPerStep, args, seed=self.seedSequence.spawn(1)[0]))
             fitnessList.append(fitness)
 
         return fitnessList
 
     def tournamentSelection(self, parameterList, fitnessList, k=3):
-        selectedIndices = np.random.choice(range(len(parameterList)), replace=False, size=k)
+        selectedIndices = self.rng.choice(len(parameterList), replace=False, size=k)
         fitnesses = [fitnessList[i] for i in selectedIndices]
         iBest = selectedIndices[np.argmax(fitnesses)]
         return parameterList[iBest]
@@ -176,10 +180,11 @@ class ParameterOptimizerResults:
         self.parameterArray = parameterArray
 
 
-def commRangeFitness(id, map, brain, simSettings, tMax, parameters):
-    commRange = parameters.get("commRange")
+def commRangeFitness(id, map, brain, simSettings, tMax, parameters, seed):
+    parameterSeed, simSeed = seed.spawn(2)
+    commRange = parameters.get("commRange", np.random.default_rng(parameterSeed))
     simSettings.commRange = commRange
-    id, results = runSimHidden(id, map, brain, simSettings, tMax)
+    id, results = runSimHidden(id, map, brain, simSettings, tMax, simSeed)
     score = results[0]
     return id, score
 
@@ -190,7 +190,7 @@ def selectRandomPosition(sim, x, y, positions):
     weights = [np.abs(np.sqrt((x-sim.colonyX)**2 + (y-sim.colonyY)**2) - d0) for x, y in positions]
     weights /= np.sum(weights)
 
-    ind = np.random.choice(range(len(positions)), p=weights)
+    ind = sim.rng.choice(len(positions), p=weights)
     return positions[ind]
 
 
@@ -4,33 +4,76 @@ import os
 import pickle
 import numpy as np
 
+# Per tick averages of a quantity, samples of the current tick are added and finish closes the tick
+# Only a running sum and count are kept for the current tick, finished averages go into a growing float64 array
+# together with their prefix sums so that pastAverage takes constant time
 class Log:
 
-    def __init__(self):
-        self.current = []
-        self.log = []
+    def __init__(self, log=()):
+
+        self.currentSum = 0
+        self.currentCount = 0
+
+        log = np.asarray(log, dtype=float)
+        self.n = len(log)
+        self.values = np.zeros(max(1024, 2 * self.n))
+        self.values[:self.n] = log
+        self.prefixSums = np.zeros(len(self.values) + 1)  # prefixSums[i] is the sum of the first i finished values
+        np.cumsum(log, out=self.prefixSums[1:self.n+1])
+
+    # Finished per tick averages
+    @property
+    def log(self):
+        return self.values[:self.n]
 
     def add(self, x):
-        self.current.append(x)
+        self.currentSum += x
+        self.currentCount += 1
+
+    def addAll(self, xs):
+        self.currentSum += np.sum(xs)
+        self.currentCount += len(xs)
 
     def finish(self):
 
-        if len(self.current) > 0:
-            xAvg = np.average(self.current)
+        if self.currentCount > 0:
+            xAvg = self.currentSum / self.currentCount
         else:
             xAvg = 0
 
-        self.log.append(xAvg)
-        self.current = []
+        if self.n == len(self.values):
+            self.values = np.concatenate([self.values, np.zeros(len(self.values))])
+            self.prefixSums = np.concatenate([self.prefixSums, np.zeros(len(self.values) - len(self.prefixSums) + 1)])
+
+        self.values[self.n] = xAvg
+        self.prefixSums[self.n + 1] = self.prefixSums[self.n] + xAvg
+        self.n += 1
+
+        self.currentSum = 0
+        self.currentCount = 0
 
+    # Average of the last window finished values, or of all of them if there are fewer
     def pastAverage(self, window):
 
-        n = len(self.log)
+        window = min(window, self.n)
+
+        if window == 0:
+            return np.nan
+
+        return (self.prefixSums[self.n] - self.prefixSums[self.n - window]) / window
+
+    # Only the finished values are pickled, results pickled with the old list based Log can still be loaded
+    def __getstate__(self):
+        return {"log": np.array(self.log), "currentSum": self.currentSum, "currentCount": self.currentCount}
+
+    def __setstate__(self, state):
+
+        self.__init__(state["log"])
 
-        if window > n:
-            return np.average(self.log)
+        if "current" in state:
+            self.addAll(state["current"])
         else:
-            return np.average(self.log[n-window:n])
+            self.currentSum, self.currentCount = state["currentSum"], state["currentCount"]
 
 
 # Saves results of simulation to a folder
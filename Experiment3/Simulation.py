@@ -10,7 +10,7 @@ import math
 from Agent import Agent
 from Settings import Settings, Results
 from Saver import save, Log
-from ChunkManager import ChunkManager
+from SpatialHash import SpatialHash
 from BaseClasses import Brain
 from Automata import Automata
 from BehaviourTree import BehaviourTree
@@ -42,7 +42,10 @@ class SimSettings:
 
 class Simulation:
 
-    def __init__(self, map: Map, brain: Brain, simSettings: SimSettings, pathfinder: Pathfinder):
+    def __init__(self, map: Map, brain: Brain, simSettings: SimSettings, pathfinder: Pathfinder, seed=None):
+
+        # All randomness of the run comes from this generator, seed can be an int or a SeedSequence
+        self.rng = np.random.default_rng(seed)
 
         self.pathfinder = pathfinder
         self.smellRange = simSettings.smellRange
@@ -89,31 +92,30 @@ class Simulation:
         self.creatureCount = map.creatureCount
         self.Lx, self.Ly = map.Lx, map.Ly
 
-        self.creatureArray = np.empty((self.Lx,self.Ly), dtype=list)
+        self.agentCountArray = np.zeros((self.Lx, self.Ly), dtype=np.int32)  # Number of agents on every tile, agents can share tiles
         self.hasFoodArray = np.full((self.Lx, self.Ly), False, dtype=bool)
 
         self.hasWallArray = map.hasWallArray.copy()
         self.foodDensityArray = map.foodDensityArray.copy()
         self.foodAmountArray = map.foodAmountArray.copy()
 
-        self.foodChunkManager = ChunkManager(self.smellRange, self.smellRange, self.Lx, self.Ly)
+        self.foodChunkManager = SpatialHash(self.smellRange, self.smellRange, self.Lx, self.Ly)
 
         for x in range(self.Lx):
             for y in range(self.Ly):
-                self.creatureArray[x, y] = []
                 for _ in range(map.creatureAmountArray[x, y]):
                     self.addCreature(x, y)
 
-                if map.foodAmountArray[x, y] > 0:
-                    self.foodPosList.append((x, y))
-                    self.hasFoodArray[x, y] = True
-                    self.foodChunkManager.add(x, y)
+        xs, ys = np.nonzero(map.foodAmountArray > 0)
+        self.foodPosList.extend(zip(xs.tolist(), ys.tolist()))
+        self.hasFoodArray[xs, ys] = True
+        self.foodChunkManager.addMany(xs, ys)
 
 
     def addCreature(self, x, y):
 
         creature = Agent(x, y, self.idCounter)
-        self.creatureArray[x, y].append(creature)
+        self.agentCountArray[x, y] += 1
         self.agentList.append(creature)
         self.idCounter += 1
 
@@ -268,10 +270,10 @@ class Simulation:
                          self.avgAgentCenterDistanceList, self.avgWaypointCenterDistanceList, self.avgWaypointAgentDistanceList, self.scoreList, self.foodCollectedList], dtype=object)
 
 
-def runSimHidden(id, map, brain, simSettings, tMax):
+def runSimHidden(id, map, brain, simSettings, tMax, seed=None):
     pathfinder = Pathfinder(map).init()
 
-    sim = Simulation(map, brain, simSettings, pathfinder)
+    sim = Simulation(map, brain, simSettings, pathfinder, seed)
     return id, sim.runHidden(tMax)
 
 def runSim(map, brain, simSettings, pathfinder):
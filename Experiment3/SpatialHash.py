@@ -0,0 +1,129 @@
+#-----Imports-----#
+import math
+import numpy as np
+
+
+# Spatial index of points on a Lx by Ly grid, at most one point per tile
+# The grid is divided into dx by dy chunks and every chunk stores the points of itself and its 8 neighbouring chunks
+# in one contiguous block, so a neighbour query is a slice of that block
+class SpatialHash:
+
+    def __init__(self, dx, dy, Lx, Ly):
+
+        self.dx = dx
+        self.dy = dy
+        self.Lx = Lx
+        self.Ly = Ly
+        self.Nx = math.ceil(Lx / dx)
+        self.Ny = math.ceil(Ly / dy)
+
+        # A block of 3x3 chunks holds at most one point per tile
+        self.capacity = 9 * dx * dy
+        dtype = np.int16 if max(Lx, Ly) <= np.iinfo(np.int16).max else np.int32
+
+        self.points = np.zeros((self.Nx, self.Ny, self.capacity, 2), dtype=dtype)
+        self.counts = np.zeros((self.Nx, self.Ny), dtype=int)
+
+        # Slot of the point at tile (x, y) in the block of chunk (xi + i - 1, yi + j - 1), -1 if not stored there
+        self.slots = np.full((Lx, Ly, 3, 3), -1, dtype=np.int32)
+
+    def hash(self, x, y):
+        return x // self.dx, y // self.dy
+
+    # Chunk indices of the chunks around chunk (xi, yi) together with their position in the 3x3 neighbourhood
+    def neighbourhood(self, xi, yi):
+
+        xmin, ymin = max(0, xi-1), max(0, yi-1)
+        xmax, ymax = min(self.Nx-1, xi+1), min(self.Ny-1, yi+1)
+
+        xis, yis = np.meshgrid(np.arange(xmin, xmax+1), np.arange(ymin, ymax+1), indexing='ij')
+        xis, yis = xis.ravel(), yis.ravel()
+
+        return xis, yis, xis - xi + 1, yis - yi + 1
+
+    def add(self, x, y):
+
+        xis, yis, i, j = self.neighbourhood(*self.hash(x, y))
+
+        slots = self.counts[xis, yis]
+        self.points[xis, yis, slots] = x, y
+        self.slots[x, y, i, j] = slots
+        self.counts[xis, yis] += 1
+
+    # Adds the points (x[k], y[k]) at once, the blocks end up exactly as after calling add for every point in order
+    def addMany(self, x, y):
+
+        x, y = np.asarray(x, dtype=int), np.asarray(y, dtype=int)
+        if len(x) == 0:
+            return
+
+        # Every point goes into the block of its own chunk and of the existing chunks around it
+        i, j = np.divmod(np.arange(9), 3)
+        xi, yi = self.hash(x, y)
+        xis, yis = xi[:, None] + i - 1, yi[:, None] + j - 1
+        valid = (xis >= 0) & (xis < self.Nx) & (yis >= 0) & (yis < self.Ny)
+
+        rows = np.nonzero(valid)[0]
+        xs, ys = x[rows], y[rows]
+        xis, yis = xis[valid], yis[valid]
+        i, j = np.broadcast_to(i, valid.shape)[valid], np.broadcast_to(j, valid.shape)[valid]
+
+        # Rank of every entry among the entries of its block, in the order of the points
+        keys = xis * self.Ny + yis
+        order = np.argsort(keys, kind='stable')
+        sortedKeys = keys[order]
+        starts = np.flatnonzero(np.r_[True, sortedKeys[1:] != sortedKeys[:-1]])
+        ranks = np.empty(len(keys), dtype=int)
+        ranks[order] = np.arange(len(keys)) - np.repeat(starts, np.diff(np.r_[starts, len(keys)]))
+
+        slots = self.counts[xis, yis] + ranks
+        self.points[xis, yis, slots, 0] = xs
+        self.points[xis, yis, slots, 1] = ys
+        self.slots[xs, ys, i, j] = slots
+        self.counts += np.bincount(keys, minlength=self.Nx * self.Ny).reshape(self.Nx, self.Ny)
+
+    # Fills the hole left by the point in every block with the last point of that block
+    def remove(self, x, y):
+
+        xis, yis, i, j = self.neighbourhood(*self.hash(x, y))
+
+        slots = self.slots[x, y, i, j]
+        last = self.counts[xis, yis] - 1
+
+        moved = self.points[xis, yis, last]
+        xMoved, yMoved = moved[:, 0], moved[:, 1]
+        xiMoved, yiMoved = self.hash(xMoved, yMoved)
+
+        self.points[xis, yis, slots] = moved
+        self.slots[xMoved, yMoved, xis - xiMoved + 1, yis - yiMoved + 1] = slots
+        self.slots[x, y, i, j] = -1
+        self.counts[xis, yis] = last
+
+    # All points in the chunk of (x, y) and its neighbouring chunks as a (n, 2) view, valid until the next add or remove
+    def getNeighbours(self, x, y):
+
+        xi, yi = self.hash(x, y)
+        return self.points[xi, yi, :self.counts[xi, yi]]
+
+    # Nearest point within maxDistance of every (x[k], y[k]) at once, searching the same blocks as getNeighbours
+    # Returns whether a point was found and its coordinates, ties go to the point getNeighbours lists first
+    def nearest(self, x, y, maxDistance):
+
+        x, y = np.asarray(x, dtype=int), np.asarray(y, dtype=int)
+        xi, yi = self.hash(x, y)
+
+        counts = self.counts[xi, yi]
+        width = counts.max(initial=0)
+
+        if width == 0:
+            return np.zeros(len(x), dtype=bool), np.zeros((len(x), 2), dtype=int)
+
+        points = self.points[xi, yi, :width].astype(int)
+        dSquared = (points[:, :, 0] - x[:, None])**2 + (points[:, :, 1] - y[:, None])**2
+        dSquared[np.arange(width)[None, :] >= counts[:, None]] = np.iinfo(int).max
+
+        rows = np.arange(len(x))
+        iMin = np.argmin(dSquared, axis=1)
+        found = dSquared[rows, iMin] <= maxDistance**2
+
+        return found, points[rows, iMin]
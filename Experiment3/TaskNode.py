@@ -73,7 +73,7 @@ class ReturnHomeNode(TaskNode):
             return False
 
         # Select random position to move to from possible positions
-        x, y = next[np.random.randint(len(next))]
+        x, y = next[sim.rng.integers(len(next))]
 
         # Move to new position
         agent.move(x, y, sim)
@@ -108,7 +108,7 @@ class GoToWaypoint(TaskNode):
             return False
 
         # Select random position to move to from possible positions
-        x, y = next[np.random.randint(len(next))]
+        x, y = next[sim.rng.integers(len(next))]
 
         # Move to new position
         agent.move(x, y, sim)
@@ -157,7 +157,7 @@ class GatherNode(TaskNode):
             agent.gatherFood(sim)
             return True
 
-        x, y = nextPositions[np.random.randint(len(nextPositions))]
+        x, y = nextPositions[sim.rng.integers(len(nextPositions))]
         agent.move(x, y, sim)
 
         return True
@@ -177,7 +177,7 @@ class RandomWalkNode(TaskNode):
         if len(newPositions) == 0:
             return False
 
-        xNew, yNew = newPositions[np.random.randint(len(newPositions))]
+        xNew, yNew = newPositions[sim.rng.integers(len(newPositions))]
 
         agent.move(xNew, yNew, sim)
         return True